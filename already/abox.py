@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Materialized extensions of concepts, under the closed-world assumption
+
+Every individual gets an integer id, and the extension of a concept
+(the set of its instances) is a bitset over these ids, as a python int.
+The extensions of named classes are materialized,
+those of complex concepts are computed with bitset algebra:
+And -> &, Or -> |, Not -> complement, {a, b} -> bits of a and b
+"""
+
+from array import array
+from itertools import accumulate
+
+from owlready2 import *
+from hierarchy import bitset, iter_bits
+from utils import LRUCache, hierarchy_index, nominal_index, is_instance_of, fillers
+from incremental import signature, invalidate_relation
+
+
+def satisfies(c, n, degree):
+    # does a subject with `degree` fillers, `n` of them in the filler concept, satisfy the restriction c
+    if c.type in {SOME, VALUE}:
+        return n >= 1
+    elif c.type == ONLY:
+        # as `is_instance_of`, a subject without fillers is not an instance
+        return degree > 0 and n == degree
+    elif c.type == MIN:
+        return n >= c.cardinality
+    elif c.type == MAX:
+        return n <= c.cardinality
+    elif c.type == EXACTLY:
+        return n == c.cardinality
+
+
+class RoleIndex:
+    """Adjacency of an object property in CSR form
+
+    the ids of the fillers of the subject k are `indices[indptr[k]:indptr[k+1]]`;
+    new assertions wait in `pending` until the next `compress`
+    """
+
+    def __init__(self, pairs=()):
+        self.indptr = array('q', [0])
+        self.indices = array('q')
+        self.pending = list(pairs)
+        self.compress()
+
+    def add(self, s, o):
+        self.pending.append((s, o))
+
+    def row(self, s):
+        if s + 1 < len(self.indptr):
+            return self.indices[self.indptr[s]:self.indptr[s+1]]
+        return self.indices[:0]
+
+    def compress(self):
+        if not self.pending:
+            return
+        n = len(self.indptr) - 1
+        edges = [(s, o) for s in range(n) for o in self.row(s)] + self.pending
+        degree = [0] * (max(n, max(s for s, _ in self.pending) + 1) + 1)
+        for s, _ in edges:
+            degree[s+1] += 1
+        indptr = list(accumulate(degree))
+        indices = [0] * len(edges)
+        position = indptr[:-1]
+        for s, o in edges:
+            indices[position[s]] = o
+            position[s] += 1
+        self.indptr = array('q', indptr)
+        self.indices = array('q', indices)
+        self.pending = []
+
+
+class ABoxIndex:
+    """Bitset engine for membership queries
+
+    ids: individual -> id
+    individuals: id -> individual
+    extensions: id of a named class -> bitset of its instances
+    universe: bitset of all the individuals
+    world: the Owlready world of the individuals
+
+    Relations asserted directly, e.g. `a.r.append(b)`, are seen
+    once the subject is declared again, see `build` and `Maintainer.related`.
+    """
+
+    def __init__(self, individuals=(), cache_size=1024, world=default_world):
+        self.world = world
+        self.ids = {}
+        self.individuals = []
+        self.extensions = {}
+        self.universe = 0
+        # object property -> RoleIndex, built at the first query
+        self.roles = {}
+        # extensions of complex concepts, updated when individuals are added
+        self.cache = LRUCache(cache_size)
+        self.build(individuals)
+
+    def build(self, individuals):
+        # the bits of the new individuals are set all at once
+        members = {}
+        ks, types = [], 0
+        for individual in individuals:
+            if individual in self.ids:
+                k = self.ids[individual]
+            else:
+                k = self.ids[individual] = len(self.individuals)
+                self.individuals.append(individual)
+            t = self._types(individual)
+            for c in iter_bits(t):
+                members.setdefault(c, []).append(k)
+            ks.append(k)
+            types |= t
+        for c, ks_c in members.items():
+            self.extensions[c] = self.extensions.get(c, 0) | bitset(ks_c)
+        self.universe = (1 << len(self.individuals)) - 1
+        self._refresh(ks, types)
+        self._refresh_roles(ks)
+
+    def _types(self, individual):
+        # bitset of the named classes of an individual
+        types = 0
+        for t in individual.is_a:
+            if isinstance(t, ThingClass):
+                types |= hierarchy_index.ancestor_bits(t)
+        return types
+
+    def add(self, individual):
+        """Add an individual, or take its new types into account
+
+        Return the id of the individual
+        """
+        if individual in self.ids:
+            k = self.ids[individual]
+        else:
+            k = self.ids[individual] = len(self.individuals)
+            self.individuals.append(individual)
+            self.universe |= 1 << k
+        bit = 1 << k
+        types = self._types(individual)
+        for c in iter_bits(types):
+            self.extensions[c] = self.extensions.get(c, 0) | bit
+        self._refresh([k], types)
+        return k
+
+    def _refresh(self, ks, types):
+        """Update the cached extensions after the individuals ks got types in `types`
+
+        The extensions of restrictions on these types are dropped, the individuals may be fillers;
+        the others only change at the bits of ks.
+        Large batches clear the cache, recomputing is then cheaper.
+        """
+        if len(ks) > 64:
+            self.cache.clear()
+            return
+        self.cache.invalidate(lambda c: signature(c).restricted and signature(c).classes & types)
+        updates = []
+        for c, bits in list(self.cache.data.items()):
+            for k in ks:
+                if self._member(k, c):
+                    bits |= 1 << k
+                else:
+                    bits &= ~(1 << k)
+            updates.append((c, bits))
+        self.cache.data.update((c, bits) for c, bits in updates if c in self.cache.data)
+
+    def _refresh_roles(self, ks):
+        # drop the role indexes whose rows of ks no longer match the ontology
+        for r, index in list(self.roles.items()):
+            index.compress()
+            for k in ks:
+                ids = sorted(self.ids.get(o, -1) for o in fillers(self.individuals[k], r))
+                if sorted(index.row(k)) != ids:
+                    self.drop_role(r)
+                    invalidate_relation(r)
+                    break
+
+    def drop_role(self, r):
+        """The relations of r changed outside `relate`, the index of r is rebuilt at the next query"""
+        self.roles.pop(r, None)
+        self.cache.invalidate(lambda c: signature(c).mentions(r))
+
+    def reclassify(self, k, new):
+        """The class of id k got the new ancestors `new` (bitset), so did its instances"""
+        members = self.extensions.get(k, 0)
+        if members:
+            for c in iter_bits(new):
+                self.extensions[c] = self.extensions.get(c, 0) | members
+            self.cache.invalidate(lambda c: signature(c).classes & new)
+
+    def __contains__(self, individual):
+        return individual in self.ids
+
+    def __len__(self):
+        return len(self.individuals)
+
+    def get_id(self, individual):
+        k = self.ids.get(individual)
+        return self.add(individual) if k is None else k
+
+    def bits(self, individuals):
+        # bitset of some individuals
+        bits = 0
+        for individual in individuals:
+            bits |= 1 << self.get_id(individual)
+        return bits
+
+    def extension(self, c):
+        """Bitset of the instances of a concept"""
+        if isinstance(c, ThingClass):
+            if c is Thing:
+                return self.universe
+            return self.extensions.get(hierarchy_index.add(c), 0)
+        try:
+            hash(c)
+        except TypeError:
+            return self._extension(c)
+        bits = self.cache.get(c)
+        if bits is None:
+            bits = self.cache[c] = self._extension(c)
+        return bits
+
+    def _extension(self, c):
+        if isinstance(c, And):
+            bits = self.universe
+            for cc in c.Classes:
+                bits &= self.extension(cc)
+            return bits
+        elif isinstance(c, Or):
+            bits = 0
+            for cc in c.Classes:
+                bits |= self.extension(cc)
+            return bits
+        elif isinstance(c, Not):
+            return self.universe & ~self.extension(c.Class)
+        elif isinstance(c, OneOf):
+            return self.bits(c.instances)
+        elif isinstance(c, Restriction) and isinstance(c.property, ObjectPropertyClass) \
+        and c.type in {SOME, ONLY, VALUE, MIN, MAX, EXACTLY}:
+            return self._restriction(c)
+        else:
+            # restrictions, one individual at a time
+            return self.bits(i for i in self.individuals if is_instance_of(i, c))
+
+    def role(self, r):
+        index = self.roles.get(r)
+        if index is None:
+            index = self.roles[r] = RoleIndex([(self.get_id(s), self.get_id(o)) for s, o in r.get_relations()])
+        return index
+
+    def relate(self, subject, r, filler):
+        """Assert `subject r filler`, in the ontology and in the index"""
+        index = self.role(r)
+        values = getattr(subject, r.name)
+        if isinstance(values, list):
+            values.append(filler)
+            index.add(self.get_id(subject), self.get_id(filler))
+        else:
+            # functional property, the former filler is replaced
+            setattr(subject, r.name, filler)
+            del self.roles[r]
+        self.cache.invalidate(lambda c: signature(c).mentions(r))
+        invalidate_relation(r)
+
+    def _restriction(self, c):
+        index = self.role(c.property)
+        index.compress()
+        if c.type == VALUE:
+            targets = 1 << self.get_id(c.value)
+        else:
+            targets = self.extension(c.value)
+        # bytes give O(1) bit tests, unlike shifts of a long int
+        targets = targets.to_bytes((len(self.individuals) + 7) // 8, 'little')
+        satisfied, subjects = [], []
+        indptr, indices = index.indptr, index.indices
+        for s in range(len(indptr) - 1):
+            degree = indptr[s+1] - indptr[s]
+            if degree:
+                subjects.append(s)
+                n = sum(targets[o >> 3] >> (o & 7) & 1 for o in indices[indptr[s]:indptr[s+1]])
+                if satisfies(c, n, degree):
+                    satisfied.append(s)
+        bits = bitset(satisfied)
+        if satisfies(c, 0, 0):
+            bits |= self.universe & ~bitset(subjects)
+        return bits
+
+    def _member(self, k, c):
+        # is the individual k an instance of c, without the cached extension of c
+        if isinstance(c, ThingClass):
+            return self.extension(c) >> k & 1 == 1
+        elif isinstance(c, And):
+            return all(self._member(k, cc) for cc in c.Classes)
+        elif isinstance(c, Or):
+            return any(self._member(k, cc) for cc in c.Classes)
+        elif isinstance(c, Not):
+            return not self._member(k, c.Class)
+        elif isinstance(c, OneOf):
+            return self.individuals[k] in nominal_index.members(c)
+        elif isinstance(c, Restriction) and isinstance(c.property, ObjectPropertyClass) \
+        and c.type in {SOME, ONLY, VALUE, MIN, MAX, EXACTLY}:
+            index = self.role(c.property)
+            index.compress()
+            row = index.row(k)
+            if c.type == VALUE:
+                target = self.ids.get(c.value)
+                n = sum(o == target for o in row)
+            else:
+                targets = self.extension(c.value)
+                n = sum(self._member(o, c.value) if o == k else targets >> o & 1 for o in row)
+            return satisfies(c, n, len(row))
+        return is_instance_of(self.individuals[k], c)
+
+    def contains(self, individual, c):
+        # individual : c
+        k = self.get_id(individual)
+        return self.extension(c) >> k & 1 == 1
+
+    def members(self, c):
+        return [self.individuals[k] for k in iter_bits(self.extension(c))]
+
+    def count(self, c):
+        return bin(self.extension(c)).count('1')
+
+    def matrix(self, individuals, concepts):
+        """Membership matrix of individuals x concepts, as a numpy bool array
+
+        The extension of each concept, and of its sub-concepts, is computed once
+        for the whole batch.
+        """
+        import numpy as np
+        ids = np.array([self.get_id(individual) for individual in individuals], dtype=np.intp)
+        # the extensions may register new individuals, e.g. the members of a OneOf
+        extensions = [self.extension(c) for c in concepts]
+        nbytes = (len(self.individuals) + 7) // 8
+        M = np.empty((len(ids), len(concepts)), dtype=bool)
+        for j, extension in enumerate(extensions):
+            bits = np.frombuffer(extension.to_bytes(nbytes, 'little'), dtype=np.uint8)
+            M[:, j] = np.unpackbits(bits, bitorder='little')[ids]
+        return M
@@ -5,6 +5,32 @@ import pyparsing_ext as ppx
 from owlready2 import *
 from keywords import *
 from utils import *
+import planner
+
+
+def lookup(calculator, name, free=()):
+    """Compile the name `name`
+
+    it is resolved at once, unless it is free, a variable ($...) or undefined
+    """
+    if name in free or name.startswith('$') or name not in calculator:
+        return lambda env: env[name]
+    value = calculator[name]
+    return lambda env: value
+
+
+def compile_action(action, calculator, free=()):
+    """Compile an action into a function of environments (calculators)
+
+    The operators and the names that are not free are resolved once with `calculator`,
+    and the tree is not walked any more, e.g.
+        f = compile_action(action, calculator)
+        f(calculator | {'$x': i})
+    Actions without `compile` are evaluated as usual.
+    """
+    if hasattr(action, 'compile'):
+        return action.compile(calculator, free)
+    return action.eval
 
 
 class AtomAction(ppx.BaseAction):
@@ -22,6 +48,9 @@ class AtomAction(ppx.BaseAction):
     def eval(self, calculator):
         return calculator[self.content]
 
+    def compile(self, calculator, free=()):
+        return lookup(calculator, self.content, free)
+
     def __radd__(self, s):
         return s + self.content
 
@@ -29,6 +58,11 @@ class AtomAction(ppx.BaseAction):
     def depth(self):
         return self._depth
 
+    @property
+    def cost(self):
+        # estimated cost of evaluation, see `planner`
+        return 1
+
     def contained_in(self, calculator):
         return self.content in calculator
 
@@ -71,7 +105,11 @@ class IndividualSetAction(ConstantAction):
         self.individuals = self.tokens[:]
 
     def eval(self, calculator):
-        return OneOf([i.eval(calculator) for i in self.individuals])
+        return calculator.intern(OneOf([i.eval(calculator) for i in self.individuals]))
+
+    def compile(self, calculator, free=()):
+        individuals = [compile_action(i, calculator, free) for i in self.individuals]
+        return lambda env: env.intern(OneOf([i(env) for i in individuals]))
 
 class VariableConceptAction(AtomAction):
     names = ('type',)
@@ -112,7 +150,7 @@ class QuantifierAction(ppx.BaseAction):
             return lambda A: r.min(self.num, A)
         elif self.content == 'less':
             return lambda A: r.max(self.num, A)
-        elif self.content == 'exact':
+        elif self.content == 'equal':
             return lambda A: r.exactly(self.num, A)
 
     def __eq__(self, other):
@@ -128,7 +166,17 @@ class RestrictionAction(ppx.RightUnaryOperatorAction):
     names = ('quantifier', 'relation')
 
     def eval(self, calculator):
-        return self.quantifier(self.relation)(self.operand)
+        return calculator.intern(self.quantifier(calculator[self.relation])(self.operand.eval(calculator)))
+
+    def compile(self, calculator, free=()):
+        relation = lookup(calculator, self.relation, free)
+        operand = compile_action(self.operand, calculator, free)
+        quantifier = self.quantifier
+        return lambda env: env.intern(quantifier(relation(env))(operand(env)))
+
+    @property
+    def cost(self):
+        return 2 + self.operand.cost
 
     def __repr__(self):
         if self.quantifier == 'some':
@@ -136,11 +184,11 @@ class RestrictionAction(ppx.RightUnaryOperatorAction):
         elif self.quantifier == 'only':
             s = '∀'
         elif self.quantifier == 'more':
-            s = 'Q>={self.num}'
+            s = f'Q>={self.quantifier.num}'
         elif self.quantifier == 'less':
-            s = 'Q<={self.num}'
-        elif self.quantifier == 'exact':
-            s = 'Q={self.num}'
+            s = f'Q<={self.quantifier.num}'
+        elif self.quantifier == 'equal':
+            s = f'Q={self.quantifier.num}'
         s += f' {self.relation}.'
         arg = self.operand
         s += f'{arg:p}' if isinstance(arg, (AndAction, OrAction)) else f'{arg}'
@@ -150,7 +198,16 @@ class RestrictionAction(ppx.RightUnaryOperatorAction):
 
 class NegationAction(ppx.RightUnaryOperatorAction):
     def eval(self, calculator):
-        return calculator(self.function)(self.operand)
+        return calculator(self.function)(self.operand.eval(calculator))
+
+    def compile(self, calculator, free=()):
+        f = calculator(self.function)
+        operand = compile_action(self.operand, calculator, free)
+        return lambda env: f(operand(env))
+
+    @property
+    def cost(self):
+        return 1 + self.operand.cost
 
     def __repr__(self):
         s = '~'
@@ -164,6 +221,15 @@ class BinaryOperatorAction(ppx.BinaryOperatorAction):
     def eval(self, calculator):
         return calculator(self.function)([arg.eval(calculator) for arg in self.args])
 
+    def compile(self, calculator, free=()):
+        f = calculator(self.function)
+        args = [compile_action(arg, calculator, free) for arg in self.args]
+        return lambda env: f([arg(env) for arg in args])
+
+    @property
+    def cost(self):
+        return 1 + sum(arg.cost for arg in self.args)
+
 
 class AndAction(BinaryOperatorAction):
     def __repr__(self):
@@ -200,6 +266,7 @@ class DeclarationAction(ppx.BaseAction):
 
     def eval(self, calculator):
         self.create(calculator)
+        calculator.declared(calculator[self.lhs_name])
 
     def create(self, calculator, klass=Thing):
         bases, others = self.base_concepts.eval(calculator)
@@ -252,6 +319,8 @@ class DefinitionAction(DeclarationAction):
 
 class FormulaAction(ppx.BinaryOperatorAction):
     def __init__(self, instring='', loc=0, tokens=[]):
+        # the source is kept by the statement sequence, see `profiling`
+        self.loc = loc
         self.args = tokens[0::2]
         if len(set(tokens[1::2]))==1:
             self.ishybrid = False
@@ -261,6 +330,13 @@ class FormulaAction(ppx.BinaryOperatorAction):
             self.function = tokens[1::2]
         self.associative = True
 
+    @property
+    def operators(self):
+        # the operator of each pair of neighbouring operands
+        if self.ishybrid:
+            return self.function
+        return [self.function] * (len(self.args) - 1)
+
 class ContainingFormulaAction(FormulaAction):
     def __init__(self, instring='', loc=0, tokens=[]):
         super(ContainingFormulaAction, self).__init__(instring, loc, tokens)
@@ -269,18 +345,61 @@ class ContainingFormulaAction(FormulaAction):
     def eval(self, calculator):
         individual = self.individual.eval(calculator)
         concept = self.concept.eval(calculator)
-        return is_instance_of(individual, concept)
+        return calculator(':')(individual, concept)
+
+    def compile(self, calculator, free=()):
+        f = calculator(':')
+        individual = compile_action(self.individual, calculator, free)
+        concept = compile_action(self.concept, calculator, free)
+        return lambda env: f(individual(env), concept(env))
 
 class ComparisonFormulaAction(FormulaAction):
+    """A <= B <= C ...
+
+    Each operand is evaluated once, when it is needed for the first time,
+    the checks run in the order of `plan` and stop at the first failure.
+    """
     def __init__(self, instring='', loc=0, tokens=[]):
         super(ComparisonFormulaAction, self).__init__(instring, loc, tokens)
+        self._plan = None
+
+    @property
+    def plan(self):
+        # [(k, estimated cost), ...], the order of the checks of the pairs (A_k, A_k+1)
+        if self._plan is None:
+            costs = [getattr(arg, 'cost', 1) for arg in self.args]
+            self._plan = planner.plan_chain(costs, self.operators)
+        return self._plan
+
+    def explain(self):
+        return '\n'.join(f'{self.args[k]} {self.operators[k]} {self.args[k+1]}  (cost {cost})' for k, cost in self.plan)
 
     def eval(self, calculator):
-        for left, right in zip(self.args[:-1], self.args[1:]):
-            if not calculator(self.function)(left, right):
+        values = {}
+        def value(k):
+            if k not in values:
+                values[k] = self.args[k].eval(calculator)
+            return values[k]
+        operators = self.operators
+        for k, _ in self.plan:
+            if not calculator(operators[k])(value(k), value(k+1)):
                 return False
-        else:
+        return True
+
+    def compile(self, calculator, free=()):
+        operators = self.operators
+        plan = [(k, calculator(operators[k])) for k, _ in self.plan]
+        args = [compile_action(arg, calculator, free) for arg in self.args]
+        def f(env):
+            values = {}
+            for k, op in plan:
+                for j in (k, k+1):
+                    if j not in values:
+                        values[j] = args[j](env)
+                if not op(values[k], values[k+1]):
+                    return False
             return True
+        return f
 
 
 class StatementSequenceAction(ppx.BaseAction):
@@ -289,6 +408,14 @@ class StatementSequenceAction(ppx.BaseAction):
             ret = token.eval(calculator)
         return ret
 
+    def compile(self, calculator, free=()):
+        statements = [compile_action(token, calculator, free) for token in self.tokens]
+        def f(env):
+            for statement in statements:
+                ret = statement(env)
+            return ret
+        return f
+
 
 class MappingFormulaAction(FormulaAction):
     def eval(self, calculator):
@@ -6,7 +6,10 @@ Design Class Diagram
 [:Semantic Calculator]  <|---- * [dict[str:Owlready object]]
 """
 
+import copy
 import types
+import weakref
+from collections import ChainMap
 
 anaphora = '@'
 
@@ -15,7 +18,7 @@ class BaseCalculator:
 
     It is recommanded to implement `__call__` in sub classes
 
-    memory: assignment for variables
+    memory: assignment for variables, a dict or a `ChainMap` of scopes
     dictionary: intereption for constants
     """
     def __init__(self, memory=None, dictionary=None):
@@ -31,17 +34,22 @@ class BaseCalculator:
         return self.__dictionary
 
     def copy(self):
-        return self.__class__(memory=self.memory.copy(), dictionary=self.dictionary)
+        # the dictionary, and any other state, is shared with the copy
+        cpy = copy.copy(self)
+        cpy.__memory = self.memory.copy()
+        return cpy
 
     def set_constant(self, k, v):
         self.__dictionary[k] = v
 
     def __getitem__(self, k):
-        if k in self.memory:
+        try:
             return self.memory[k]
-        elif k in self.dictionary:
+        except KeyError:
+            pass
+        try:
             return self.dictionary[k]
-        else:
+        except KeyError:
             raise NameError(f'{k} is not definded.')
 
     def __setitem__(self, k, v):
@@ -52,32 +60,58 @@ class BaseCalculator:
         self.__memory[anaphora] = v
 
     def set(self, **kwargs):
-        for k, v in kwargs:
-            if k in self.dictionary:
-                raise NameError(f'{k} could not be redefinded.')
-            else:
-                self.__memory[k] = v
-        self.__memory[anaphora] = v
+        for k, v in kwargs.items():
+            self[k] = v
 
     def __call__(self, x):
         raise NotImplementedError
 
+    def declared(self, *xs):
+        # called after declarations create or change `xs`
+        pass
+
+    def intern(self, x):
+        # canonical representative of the value x
+        return x
+
     def __contains__(self, x):
         return x in self.memory or x in self.dictionary
 
     def __or__(self, d):
-        cpy = self.copy()
+        """Bind the variables in d, in a new scope
+
+        The memory is not copied, the new frame is chained to it,
+        so binding costs O(len(d)), whatever the size of the memory.
+        """
+        frame = {}
         for k, v in d.items():
-            cpy[k] = v
+            if k in self.dictionary:
+                raise NameError(f'{k} could not be redefinded.')
+            frame[k] = frame[anaphora] = v
+        cpy = copy.copy(self)
+        if isinstance(self.memory, ChainMap):
+            cpy.__memory = self.memory.new_child(frame)
+        else:
+            cpy.__memory = ChainMap(frame, self.memory)
         return cpy
 
 
 from utils import *
+from incremental import Maintainer
 
 def si_a(A, B):
     return is_a(B, A)
 
+def lt(A, B):
+    # strict subsumption
+    return is_a(A, B) and not is_a(B, A)
+
+def gt(A, B):
+    return lt(B, A)
+
 def eq(A, B):
+    if A is B:
+        return True
     return B in A.INDIRECT_equivalent_to
 
 class OwlreadyCalculator(BaseCalculator):
@@ -85,9 +119,18 @@ class OwlreadyCalculator(BaseCalculator):
 
     provide the semantics of constants and operators in DLs.
     """
-    def __init__(self, memory={}):
-        dictionary = {'|':Or, '&': And, '~': Not, '<=': is_a, '=>': si_a, '==': eq}
+    def __init__(self, memory=None, dictionary=None):
+        if dictionary is None:
+            dictionary = {'|': self.disjunction, '&': self.conjunction, '~': self.negation,
+            '<=': is_a, '=>': si_a, '>=': si_a, '<': lt, '>': gt, '==': eq, ':': is_instance_of}
         super(OwlreadyCalculator, self).__init__(memory, dictionary)
+        self.abox = None
+        # propagates the declarations to the derived state
+        self.maintainer = Maintainer()
+        # hash consing: normalized form -> the canonical concept, as long as it is used
+        self.concepts = weakref.WeakValueDictionary()
+        # id of a canonical concept -> its normalized form, dropped with the concept
+        self._keys = {}
 
 
     def __call__(self, x, *args, **kwargs):
@@ -98,5 +141,107 @@ class OwlreadyCalculator(BaseCalculator):
         else:
             return globals()[x]
 
+    def build_index(self, ontology):
+        # index the class hierarchy of the ontology, used by `<=` and `=>`
+        hierarchy_index.build(ontology.classes())
+
+    def materialize(self, ontology):
+        """Answer `i : C` with the bitset engine `ABoxIndex`
+
+        under the closed-world assumption
+        """
+        from abox import ABoxIndex
+        self.build_index(ontology)
+        world = getattr(ontology, 'world', ontology)
+        self.abox = self.maintainer.abox = ABoxIndex(ontology.individuals(), world=world)
+        self.set_constant(':', self.abox.contains)
+        return self.abox
+
+    def export_snapshot(self, filename=None, ontology=None):
+        """Export the hierarchy and the ABox in a read-only `snapshot.Snapshot`
+
+        The ABox is materialized from `ontology` first, if it is not yet.
+        The object properties are those of `ontology`, or of the world of the ABox.
+        Return the filename, or, without filename, the `SharedMemory` block
+        (workers attach to `shm.name`), to be closed and unlinked by the caller.
+        """
+        import snapshot
+        if self.abox is None:
+            if ontology is None:
+                raise ValueError('no ABox to export, materialize an ontology first')
+            self.materialize(ontology)
+        world = self.abox.world if ontology is None else ontology
+        properties = [r for r in world.object_properties() if r.name]
+        return snapshot.export(hierarchy_index, self.abox, properties, filename)
+
+    def instance_matrix(self, individuals, concepts):
+        """Check `i : c` for all the individuals and concepts at once
+
+        Return a numpy bool matrix of shape (individuals, concepts)
+        """
+        from abox import ABoxIndex
+        abox = self.abox if self.abox is not None else ABoxIndex(individuals)
+        return abox.matrix(individuals, concepts)
+
+    def declared(self, *xs):
+        # only the results depending on the new declarations are dropped
+        self.maintainer.declared(*xs)
+
+    def key(self, x):
+        # normalized form of a canonical concept, named concepts stand for themselves
+        return self._keys.get(id(x), x)
+
+    def _canonical(self, key, make):
+        c = self.concepts.get(key)
+        if c is None:
+            c = self.concepts[key] = make()
+            self._keys[id(c)] = key
+            weakref.finalize(c, self._keys.pop, id(c), None)
+        return c
+
+    def _junction(self, klass, operands):
+        # And/Or of flattened, deduplicated and sorted operands
+        flat = {}
+        for c in operands:
+            c = self.intern(c)
+            for cc in (c.Classes if type(c) is klass else (c,)):
+                flat[self.key(cc)] = cc
+        if len(flat) == 1:
+            return next(iter(flat.values()))
+        return self._canonical((klass, frozenset(flat)), lambda: klass(sorted(flat.values(), key=str)))
+
+    def conjunction(self, operands):
+        return self._junction(And, operands)
+
+    def disjunction(self, operands):
+        return self._junction(Or, operands)
+
+    def negation(self, operand):
+        operand = self.intern(operand)
+        return self._canonical((Not, self.key(operand)), lambda: Not(operand))
+
+    def intern(self, x):
+        """Return the canonical concept structurally equal to x
+
+        Equal concepts are then identical, and can be compared with `is`.
+        This holds for the concepts of queries: Owlready copies a concept
+        used in the definitions of two entities, e.g. in their `is_a`.
+        """
+        if id(x) in self._keys:
+            return x
+        if isinstance(x, (And, Or)):
+            return self._junction(type(x), x.Classes)
+        elif isinstance(x, Not):
+            return self.negation(x.Class)
+        elif isinstance(x, OneOf):
+            instances = list(dict.fromkeys(x.instances))
+            return self._canonical((OneOf, frozenset(instances)), lambda: OneOf(instances))
+        elif isinstance(x, Restriction):
+            value = self.intern(x.value)
+            key = Restriction, x.property, x.type, x.cardinality, self.key(value)
+            return self._canonical(key, lambda: Restriction(x.property, x.type, x.cardinality, value))
+        else:
+            return x
+
     def create_concept(name, *args, **kwargs):
         self[name] = types.new_class(name, *args, **kwargs)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Precompiled DL scripts, as .pyc files for python
+
+`script.dl` is cached in `script.dlc`:
+    header: magic, format version, fingerprint of the grammar and the actions,
+            sha256 of the source, number of statements
+    offsets: n + 1 uint64, where the statements start and end
+    statements: one pickle per statement
+
+The source is not stored, every node refers to the one being loaded.
+The file is memory-mapped and a statement is unpickled when it is used for the first time;
+the file is closed once every statement is unpickled, or by `close`.
+A cache whose header does not match is stale; the script is parsed again and the cache rewritten.
+
+Loading a cache unpickles it: only load the caches written by yourself,
+a .dlc file from an untrusted source can run arbitrary code.
+`DL.parseFile` only uses the cache when called with `precompiled=True`.
+"""
+
+import functools
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+import pyparsing as pp
+import actions
+import nodes
+import parser
+import pratt
+import utils
+from actions import StatementSequenceAction
+
+MAGIC = b'DLC\0'
+FORMAT = 1
+HEADER = struct.Struct('<4sH32s32sQ')
+
+
+@functools.lru_cache(maxsize=None)
+def fingerprint(language_class, lean=False):
+    # hash of the version of pyparsing and of the code of the language, the parsers, the actions and the nodes
+    h = hashlib.sha256(f'{FORMAT} {pickle.HIGHEST_PROTOCOL} {pp.__version__} {language_class.__qualname__} {lean}'.encode())
+    for module in (actions, nodes, parser, pratt, utils, sys.modules[language_class.__module__]):
+        filename = getattr(module, '__file__', None)
+        if filename:
+            with open(filename, 'rb') as fo:
+                h.update(fo.read())
+    return h.digest()
+
+
+def cache_path(filename):
+    return os.path.splitext(filename)[0] + '.dlc'
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file, instring):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.instring = instring
+
+    def persistent_id(self, obj):
+        return 'source' if obj is self.instring and obj is not None else None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, instring):
+        super().__init__(file)
+        self.instring = instring
+
+    def persistent_load(self, pid):
+        if pid == 'source':
+            return self.instring
+        raise pickle.UnpicklingError(f'unknown persistent id {pid!r}')
+
+
+def dump(filename, source, tree, key):
+    """Write the statements of a parsed source
+
+    key: the fingerprint of the language
+    """
+    data = io.BytesIO()
+    offsets = array('Q', [0])
+    # lean trees do not refer to the source
+    pickler = _Pickler(data, getattr(tree, 'instring', None))
+    for statement in tree.tokens:
+        pickler.dump(statement)
+        pickler.clear_memo()
+        offsets.append(data.tell())
+    digest = hashlib.sha256(source.encode()).digest()
+    tmp = f'{filename}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as fo:
+            fo.write(HEADER.pack(MAGIC, FORMAT, key, digest, len(offsets) - 1))
+            fo.write(offsets.tobytes())
+            fo.write(data.getbuffer())
+        os.replace(tmp, filename)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+class LazyStatements(Sequence):
+    """The statements of a .dlc file, unpickled on demand"""
+
+    def __init__(self, buffer, offsets, start, instring):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.start = start
+        self.instring = instring
+        self.decoded = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[j] for j in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if k not in self.decoded:
+            a, b = self.start + self.offsets[k], self.start + self.offsets[k+1]
+            self.decoded[k] = _Unpickler(io.BytesIO(self.buffer[a:b]), self.instring).load()
+            if len(self.decoded) == len(self):
+                self.close()
+        return self.decoded[k]
+
+    def close(self):
+        # the statements that are not unpickled yet are lost
+        if not self.buffer.closed:
+            self.buffer.close()
+
+
+class CachedStatementSequence(StatementSequenceAction):
+    """`StatementSequenceAction` over the statements of a .dlc file"""
+
+    def __init__(self, instring, tokens):
+        self.instring = instring
+        self.loc = 0
+        self.tokens = tokens
+
+
+def _check(buffer, source, key):
+    # the offsets of the statements and where they start, or None if the cache is stale
+    if len(buffer) < HEADER.size:
+        return None
+    magic, version, key_, digest, n = HEADER.unpack_from(buffer)
+    if (magic, version, key_) != (MAGIC, FORMAT, key) or digest != hashlib.sha256(source.encode()).digest():
+        return None
+    start = HEADER.size + 8 * (n + 1)
+    offsets = array('Q')
+    offsets.frombytes(buffer[HEADER.size:start])
+    if len(buffer) != start + offsets[-1]:
+        return None
+    return offsets, start
+
+
+def load(filename, source, key, lean=False):
+    """The parsed source from its cache, or None if it is missing or stale
+
+    lean: return a `nodes.SequenceNode`, as `DL(lean=True).parse`
+    """
+    try:
+        with open(filename, 'rb') as fo:
+            buffer = mmap.mmap(fo.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    checked = _check(buffer, source, key)
+    if checked is None:
+        buffer.close()
+        return None
+    # as pyparsing does, before parsing
+    instring = source.expandtabs()
+    statements = LazyStatements(buffer, *checked, instring)
+    if not len(statements):
+        statements.close()
+    if lean:
+        return nodes.SequenceNode(statements, loc=0)
+    return CachedStatementSequence(instring, statements)
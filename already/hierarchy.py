@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Transitive closure of the hierarchy of named classes
+
+Every class gets an integer id, parents before children (a topological order),
+and the set of its ancestors, itself included, is stored as a bitset (python int).
+Then `A <= B` is just `ancestors[A] >> id[B] & 1`.
+
+Only asserted named superclasses and named equivalent classes are followed;
+equivalent classes share their ancestors, they are children of each other.
+The classes are indexed as they are met, and updated by `update`;
+`is_current` tells whether the ancestors of a class were changed otherwise,
+e.g. by `A.is_a.append(B)` or a reasoner. Call `rebuild` after running a reasoner.
+"""
+
+from owlready2 import *
+
+
+def iter_bits(bits):
+    # positions of the set bits of an int, byte by byte to avoid long int arithmetic
+    for k, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+        while byte:
+            low = byte & -byte
+            yield k << 3 | low.bit_length() - 1
+            byte ^= low
+
+
+def bitset(positions):
+    # the int with the given set bits
+    positions = list(positions)
+    data = bytearray((max(positions, default=-1) >> 3) + 1)
+    for k in positions:
+        data[k >> 3] |= 1 << (k & 7)
+    return int.from_bytes(data, 'little')
+
+
+def named_parents(klass):
+    return [b for b in klass.is_a if isinstance(b, ThingClass)]
+
+
+def named_equivalents(klass):
+    return [e for e in klass.equivalent_to if isinstance(e, ThingClass)]
+
+
+def links(klass):
+    # what the ancestors of a class are computed from
+    return tuple(named_parents(klass)), tuple(named_equivalents(klass))
+
+
+class HierarchyIndex:
+    """Ancestor bitsets of named classes
+
+    ids: class -> id
+    classes: id -> class
+    ancestors: id -> bitset of the ids of the ancestors
+    children: id -> ids of the direct subclasses, and of the equivalent classes
+    links: id -> named superclasses and equivalent classes, when the class was indexed or updated
+    changes: (id, new ancestors) of the classes whose ancestors grew,
+             their descendants excepted, to be cleared by the caller
+    """
+
+    def __init__(self, classes=()):
+        self.ids = {}
+        self.classes = []
+        self.ancestors = []
+        self.children = []
+        self.links = []
+        self.changes = []
+        self._append(Thing)
+        self.build(classes)
+
+    def build(self, classes):
+        for klass in classes:
+            self.add(klass)
+
+    def rebuild(self):
+        classes = self.classes[1:]
+        self.__init__(classes)
+
+    def _append(self, klass):
+        k = len(self.classes)
+        bits = 1 << k | 1
+        for parent in named_parents(klass):
+            p = self.ids[parent]
+            bits |= self.ancestors[p]
+            self.children[p].append(k)
+        self.ids[klass] = k
+        self.classes.append(klass)
+        self.ancestors.append(bits)
+        self.children.append([])
+        self.links.append(links(klass))
+        self._link_equivalents(k)
+        return k
+
+    def _link_equivalents(self, k):
+        # the named equivalent classes of k become children of each other
+        for e in named_equivalents(self.classes[k]):
+            j = self.add(e)
+            if j != k and j not in self.children[k]:
+                self.children[k].append(j)
+                self.children[j].append(k)
+                self._propagate(j, self.ancestors[k])
+                self._propagate(k, self.ancestors[j])
+
+    def _propagate(self, k, bits):
+        # add `bits` to the ancestors of k and of its descendants
+        new = bits & ~self.ancestors[k]
+        if new:
+            self.changes.append((k, new))
+        stack = [k] if new else []
+        while stack:
+            d = stack.pop()
+            if self.ancestors[d] & new != new:
+                self.ancestors[d] |= new
+                stack.extend(self.children[d])
+
+    def add(self, klass):
+        """Add a class, after its unknown ancestors
+
+        Return the id of the class
+        """
+        if klass in self.ids:
+            return self.ids[klass]
+        stack = [klass]
+        while stack:
+            top = stack[-1]
+            if top in self.ids:
+                stack.pop()
+                continue
+            unknown = [parent for parent in named_parents(top) if parent not in self.ids]
+            if unknown:
+                stack.extend(unknown)
+            else:
+                self._append(stack.pop())
+        return self.ids[klass]
+
+    def update(self, klass):
+        """Take the new superclasses of a class into account
+
+        The ancestors only grow, so only the class, its equivalent classes
+        and their descendants change, they are reached through the children.
+        """
+        if klass not in self.ids:
+            return self.add(klass)
+        k = self.ids[klass]
+        bits = self.ancestors[k]
+        for parent in named_parents(klass):
+            p = self.add(parent)
+            if not bits >> p & 1:
+                self.children[p].append(k)
+            bits |= self.ancestors[p]
+        self._propagate(k, bits)
+        self._link_equivalents(k)
+        self.links[k] = links(klass)
+        return k
+
+    def __contains__(self, klass):
+        return klass in self.ids
+
+    def __len__(self):
+        return len(self.classes)
+
+    def bit(self, klass):
+        return 1 << self.add(klass)
+
+    def ancestor_bits(self, klass):
+        return self.ancestors[self.add(klass)]
+
+    def descendants(self, klass):
+        # bitset of the descendants of a class, itself included
+        bits = 0
+        stack = [self.add(klass)]
+        while stack:
+            d = stack.pop()
+            if not bits >> d & 1:
+                bits |= 1 << d
+                stack.extend(self.children[d])
+        return bits
+
+    def is_current(self, klass):
+        """Are the ancestors of a class up to date
+
+        False if the named superclasses or equivalent classes of the class,
+        or of one of its ancestors, changed since they were indexed or updated
+        """
+        k = self.add(klass)
+        return all(self.links[j] == links(self.classes[j]) for j in iter_bits(self.ancestors[k]))
+
+    def is_subclass(self, A, B):
+        # A <= B
+        return self.ancestors[self.add(A)] >> self.add(B) & 1 == 1
+
+    def classes_of(self, bits):
+        # classes in a bitset
+        return [self.classes[k] for k in iter_bits(bits)]
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Incremental maintenance of the derived state
+
+Declarations only add classes, superclasses, types and relations,
+so instead of clearing every cache after each of them,
+only the results that may depend on the delta are dropped:
+- `! A :: B`: A and its descendants get new ancestors,
+  the results about these ancestors, or about the instances of A, are dropped;
+- `! i : C`: the results about i, and about restrictions on the types of i, are dropped;
+- `s r o`: the results about restrictions on r are dropped.
+
+A result `(x, c)` is checked against the signature of `c`:
+the named classes and the properties that it mentions.
+"""
+
+from collections import namedtuple
+
+from owlready2 import *
+from utils import hierarchy_index, subsumption_cache, membership_cache
+
+
+class Signature(namedtuple('Signature', ('classes', 'properties', 'nominal', 'restricted'))):
+    """What a concept depends on
+
+    classes: bitset of the ids of the named classes that it mentions
+    properties: the properties of its restrictions, None for any property
+    nominal: does it contain individuals
+    restricted: does it contain restrictions
+    """
+    __slots__ = ()
+
+    def __or__(self, other):
+        if self.properties is None or other.properties is None:
+            properties = None
+        else:
+            properties = self.properties | other.properties
+        return Signature(self.classes | other.classes, properties,
+            self.nominal or other.nominal, self.restricted or other.restricted)
+
+    def mentions(self, r):
+        return self.properties is None or r in self.properties
+
+
+EMPTY = Signature(0, frozenset(), False, False)
+# for values that are not concepts, depend on everything
+ANY = Signature(-1, None, True, True)
+
+
+def _signature(c):
+    if isinstance(c, ThingClass):
+        return Signature(hierarchy_index.bit(c), frozenset(), False, False)
+    elif isinstance(c, (And, Or)):
+        s = EMPTY
+        for cc in c.Classes:
+            s |= signature(cc)
+        return s
+    elif isinstance(c, Not):
+        return signature(c.Class)
+    elif isinstance(c, OneOf):
+        return Signature(0, frozenset(), True, False)
+    elif isinstance(c, Restriction):
+        s = Signature(0, frozenset([c.property]), False, True)
+        if isinstance(c.value, (ThingClass, Construct)):
+            s |= signature(c.value)
+        return s
+    elif isinstance(c, Thing):
+        return Signature(0, frozenset(), True, False)
+    return ANY
+
+
+_signatures = {}
+
+def signature(c):
+    try:
+        return _signatures[c]
+    except KeyError:
+        s = _signatures[c] = _signature(c)
+        if len(_signatures) > 1 << 14:
+            _signatures.clear()
+        return s
+    except TypeError:
+        return _signature(c)
+
+
+def types(x):
+    # bitset of the named classes of an individual
+    bits = 0
+    for t in getattr(x, 'is_a', ()):
+        if isinstance(t, ThingClass):
+            bits |= hierarchy_index.ancestor_bits(t)
+    return bits
+
+
+def invalidate_class(k, new):
+    """The class of id k gets the new ancestors `new` (bitset)
+
+    Return the number of dropped results
+    """
+    def subsumption(key):
+        x, c = key
+        s = signature(c)
+        if s.classes & new or signature(x).nominal:
+            return True
+        # new non-named superclasses, e.g. restrictions, of the descendants of the class
+        return s.restricted and isinstance(x, ThingClass) and hierarchy_index.ancestor_bits(x) >> k & 1
+    def membership(key):
+        x, c = key
+        s = signature(c)
+        return bool(s.classes & new) or s.restricted and types(x) >> k & 1
+    return subsumption_cache.invalidate(subsumption) + membership_cache.invalidate(membership)
+
+
+def invalidate_individuals(individuals, bits):
+    """The individuals get new types, included in `bits` (bitset)"""
+    individuals = set(individuals)
+    def subsumption(key):
+        x, c = key
+        return x in individuals or signature(x).nominal
+    def membership(key):
+        x, c = key
+        if x in individuals:
+            return True
+        # the fillers of x may be among the individuals
+        s = signature(c)
+        return s.restricted and bool(s.classes & bits)
+    return subsumption_cache.invalidate(subsumption) + membership_cache.invalidate(membership)
+
+
+def invalidate_relation(r):
+    """A new relation `s r o`"""
+    def subsumption(key):
+        x, c = key
+        return signature(x).nominal and signature(c).mentions(r)
+    def membership(key):
+        return signature(key[1]).mentions(r)
+    return subsumption_cache.invalidate(subsumption) + membership_cache.invalidate(membership)
+
+
+class Maintainer:
+    """Propagate declarations to the hierarchy, the caches and the ABox index
+
+    abox: the ABox index to maintain, if any
+    stats: numbers of declarations and of dropped results
+    """
+
+    def __init__(self, abox=None):
+        self.abox = abox
+        self.stats = {'classes': 0, 'individuals': 0, 'dropped': 0}
+
+    def declared(self, *xs):
+        individuals = []
+        for x in xs:
+            if isinstance(x, ThingClass):
+                self.declare_class(x)
+            elif isinstance(x, Thing):
+                individuals.append(x)
+        if individuals:
+            self.declare_individuals(individuals)
+
+    def declare_class(self, klass):
+        known = klass in hierarchy_index
+        hierarchy_index.changes.clear()
+        k = hierarchy_index.update(klass)
+        self.stats['classes'] += 1
+        # known classes with new superclasses, the class itself or its equivalent classes
+        for d, new in hierarchy_index.changes:
+            if d != k or known:
+                self.stats['dropped'] += invalidate_class(d, new)
+                if self.abox is not None:
+                    self.abox.reclassify(d, new)
+        hierarchy_index.changes.clear()
+
+    def declare_individuals(self, individuals):
+        bits = 1
+        for individual in individuals:
+            bits |= types(individual)
+        self.stats['individuals'] += len(individuals)
+        self.stats['dropped'] += invalidate_individuals(individuals, bits)
+        if self.abox is not None:
+            self.abox.build(individuals)
+
+    def related(self, r):
+        if self.abox is not None:
+            self.abox.drop_role(r)
+        self.stats['dropped'] += invalidate_relation(r)
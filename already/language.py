@@ -7,26 +7,202 @@ communication diagram:
 --> [:Parser]   ----->   [:Action]    ----->   [calculator]  <----->   [Owlready object]
 """
 
+import multiprocessing
+import pickle
+
 from parser import *
+import dlcache
+import pratt
+from nodes import lower, SequenceNode
+
+
+def iter_statements(fo, chunksize=1<<16, sep=';'):
+    """Split the text of a file object into statements
+
+    The file is read by chunks, so only one chunk and
+    the statement being read are kept in memory.
+    """
+    rest = ''
+    while True:
+        chunk = fo.read(chunksize)
+        if not chunk:
+            break
+        *statements, rest = (rest + chunk).split(sep)
+        for statement in statements:
+            if statement.strip():
+                yield statement
+    if rest.strip():
+        yield rest
+
+
+_worker_language = None
+
+def _init_worker(language_class, enablePackrat, lean=False, backend='pyparsing'):
+    global _worker_language
+    _worker_language = language_class(lean=lean, backend=backend)
+    _worker_language.make_parser(enablePackrat)
+
+
+def _parse_chunk(chunk):
+    # parse a chunk of statements in a worker process
+    return list(_worker_language.parse(chunk).tokens)
+
 
 class BaseLanguage:
-    def make_parser(self, enablePackrat=True):
+    """Base class of languages
+
+    cache_size: size of the LRU cache of parsed sources, keyed by the source,
+    since the trees keep locations in it, and of `matches`, keyed by the normalized source;
+    0 (default) disables it.
+    The cached trees are shared, since evaluating an action does not change it.
+    lean: lower the parsed trees into the nodes of `nodes`, that do not keep the source
+    backend: 'pyparsing' (the grammar of `parser`) or 'pratt' (the hand-written parser of `pratt`)
+    """
+
+    def __init__(self, cache_size=0, lean=False, backend='pyparsing'):
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.lean = lean
+        self.backend = backend
+
+    def _parse(self, s):
+        tree = self.expression.parseString(s)[0]
+        if not self.lean:
+            return tree
+        tree = lower(tree)
+        # the packrat cache still refers to the actions
+        pp.ParserElement.resetCache()
+        return tree
+
+    def make_parser(self, enablePackrat=True, backend=None):
         raise NotImplementedError
 
+    @staticmethod
+    def normalize(s):
+        # sources differing only by whitespaces match alike
+        return ' '.join(s.split())
+
+    def cache_info(self):
+        return None if self.cache is None else self.cache.info()
+
     def matches(self, s):
         if not hasattr(self, 'expression'):
             self.make_parser()
-        return self.expression.matches(s)
+        if self.cache is None:
+            return self.expression.matches(s)
+        key = 'matches', self.normalize(s)
+        value = self.cache.get(key)
+        if value is None:
+            value = self.cache[key] = self.expression.matches(s)
+        return value
 
     def parse(self, s):
         if not hasattr(self, 'expression'):
             self.make_parser()
-        return self.expression.parseString(s)[0]
+        if self.cache is None:
+            return self._parse(s)
+        tree = self.cache.get(s)
+        if tree is None:
+            tree = self.cache[s] = self._parse(s)
+        return tree
 
-    def parseFile(self, filename):
+    def compile(self, s, calculator, free=()):
+        """Parse and compile a source, see `compile_action`"""
+        return compile_action(self.parse(s), calculator, free)
+
+    def parallelParse(self, s, processes=None, chunk_statements=1000, enablePackrat=True):
+        """Parse a source in a pool of processes
+
+        The source is split at `;` into chunks of `chunk_statements` statements,
+        parsed by the workers; the statements are merged in source order.
+
+        Return a `StatementSequenceAction`, to be evaluated sequentially
+        """
+        statements = [statement for statement in s.split(';') if statement.strip()]
+        chunks = [';'.join(statements[k:k+chunk_statements]) for k in range(0, len(statements), chunk_statements)]
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(type(self), enablePackrat, self.lean, self.backend)) as pool:
+            parts = pool.map(_parse_chunk, chunks)
+        statements = [statement for part in parts for statement in part]
+        if self.lean:
+            return SequenceNode(tuple(statements), loc=0)
+        return StatementSequenceAction('', 0, pp.ParseResults(statements))
+
+    def parseFile(self, filename, precompiled=False):
+        """Parse a file
+
+        precompiled: load the statements from the cache `script.dlc` of `script.dl`
+        if it is up to date, otherwise parse the file and write the cache, see `dlcache`;
+        off by default since the cache is unpickled: only enable it in directories
+        where nobody else can write a .dlc file
+        """
         with open(filename, 'r') as fo:
-            return self.parse(fo.read())
+            source = fo.read()
+        if not precompiled:
+            return self.parse(source)
+        path, key = dlcache.cache_path(filename), dlcache.fingerprint(type(self), self.lean)
+        tree = dlcache.load(path, source, key, self.lean)
+        if tree is None:
+            tree = self.parse(source)
+            try:
+                dlcache.dump(path, source, tree, key)
+            except (OSError, pickle.PicklingError, TypeError, AttributeError):
+                # the tree is returned anyway, e.g. in a read-only directory
+                pass
+        return tree
+
+    def iterParse(self, fo, chunksize=1<<16):
+        """Parse the statements in a file object one by one
+
+        memory is bounded by `chunksize` and the longest statement,
+        not by the size of the file
+        """
+        if not hasattr(self, 'statement'):
+            self.make_parser()
+        for s in iter_statements(fo, chunksize):
+            statement = self.statement.parseString(s, parseAll=True)[0]
+            if self.lean:
+                statement = lower(statement)
+                pp.ParserElement.resetCache()
+            yield statement
+
+    def iterParseFile(self, filename, chunksize=1<<16):
+        with open(filename, 'r') as fo:
+            yield from self.iterParse(fo, chunksize)
+
+    def loadFile(self, filename, calculator, ontology, batch_size=10000, chunksize=1<<16):
+        """Load a file of declarations by batches, see `loader.BulkLoader`
+
+        Return the loader, `loader.stats()` gives the throughput
+        """
+        from loader import BulkLoader
+        loader = BulkLoader(calculator, ontology, batch_size)
+        for statement in self.iterParseFile(filename, chunksize):
+            loader.add(statement)
+        loader.flush()
+        return loader
+
+    def iterEvalFile(self, filename, calculator, chunksize=1<<16):
+        """Evaluate the statements in a file one by one
+
+        yield the value of each statement,
+        as soon as it is parsed and evaluated
+        """
+        for statement in self.iterParseFile(filename, chunksize):
+            yield statement.eval(calculator)
 
 
 class DL(BaseLanguage):
-    pass
\ No newline at end of file
+
+    def make_parser(self, enablePackrat=True, backend=None):
+        # the grammar is built only once, and shared by all instances
+        if backend is not None:
+            self.backend = backend
+        if self.backend == 'pratt':
+            grammar = pratt.make_grammar()
+        elif self.backend == 'pyparsing':
+            if enablePackrat:
+                pp.ParserElement.enablePackrat()
+            grammar = make_grammar()
+        else:
+            raise ValueError(f'unknown backend {self.backend!r}')
+        self.expression = grammar.statement_sequence
+        self.statement = grammar.statement
\ No newline at end of file
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Bulk loading of declarations
+
+Declarations `! i: C` and `! A :: B` are collected and created by batches:
+- the base concepts are resolved once for each distinct tuple of names,
+- an entity is created with all its named bases at once,
+- the other bases are appended to `is_a` at the end of the batch,
+- a batch is written in one transaction of the quadstore, committed at its end,
+  and the calculator is told once.
+The other statements are evaluated in order, after the pending declarations.
+The resolved bases are kept during a batch, until a concept is declared.
+"""
+
+import time
+
+from owlready2 import *
+from actions import *
+import nodes
+
+
+class BulkLoader:
+    """Loader of declarations by batches
+
+    calculator: the calculator where the names are bound
+    ontology: the ontology where the entities are created
+    batch_size: number of declarations created at once
+    """
+
+    def __init__(self, calculator, ontology, batch_size=10000):
+        self.calculator = calculator
+        self.ontology = ontology
+        self.batch_size = batch_size
+        self.pending = []
+        self.count = 0
+        self.start = self.stop = None
+        # names of the concepts of a declaration -> (bases, others), in the current batch
+        self._bases = {}
+
+    def add(self, statement):
+        """Load a statement
+
+        Return the value of the statement, or None for a delayed declaration
+        """
+        if self.start is None:
+            self.start = time.perf_counter()
+        self.count += 1
+        if type(statement) in {DeclarationAction, ConceptDeclarationAction, nodes.Declaration, nodes.ConceptDeclaration}:
+            self.pending.append(statement)
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+            return None
+        self.flush()
+        return statement.eval(self.calculator)
+
+    def resolve(self, concept_tuple):
+        # (named bases, other bases) of a declaration
+        if not all(isinstance(c, (ConceptAction, nodes.Concept)) for c in concept_tuple.concepts):
+            return concept_tuple.eval(self.calculator)
+        key = tuple(c.content for c in concept_tuple.concepts)
+        bases = self._bases.get(key)
+        if bases is None:
+            bases = self._bases[key] = concept_tuple.eval(self.calculator)
+        return bases
+
+    def flush(self):
+        if self.pending:
+            created, deferred = [], []
+            with self.ontology:
+                for statement in self.pending:
+                    bases, others = self.resolve(statement.base_concepts)
+                    name = statement.lhs_name
+                    if isinstance(statement, (ConceptDeclarationAction, nodes.ConceptDeclaration)):
+                        x = types.new_class(name, bases=bases or (Thing,))
+                        # the name may be bound to another concept in the resolved bases
+                        self._bases.clear()
+                    elif bases:
+                        x = bases[0](name, is_a=list(bases))
+                    else:
+                        x = Thing(name)
+                    self.calculator[name] = x
+                    created.append(x)
+                    if others:
+                        deferred.append((x, others))
+                for x, others in deferred:
+                    x.is_a.extend(others)
+            # Owlready keeps a transaction open, `with self.ontology` does not commit it
+            self.ontology.world.graph.commit()
+            self.calculator.declared(*created)
+            self.pending = []
+            # the names may be bound again by the next statements
+            self._bases.clear()
+        self.stop = time.perf_counter()
+
+    def stats(self):
+        # throughput of the loading, parsing included when the statements are streamed
+        seconds = (self.stop - self.start) if self.start is not None and self.stop is not None else 0
+        return {'statements': self.count, 'seconds': seconds,
+            'statements_per_second': self.count / seconds if seconds else None}
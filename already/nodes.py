@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Lean nodes of parsed sources
+
+An action keeps the source string, its location and the `ParseResults` of its tokens,
+so a tree of actions pins the whole source and the intermediate results of the parser.
+`lower` converts it into immutable nodes with `__slots__`, keeping only
+what evaluation needs: operators, operands, names and the location `loc` in the source.
+
+The nodes borrow `eval`, `compile` and `create` from the corresponding actions,
+so both trees are evaluated the same way.
+
+usage:
+    tree = lower(DL().parse(s))
+    tree.eval(calculator)
+"""
+
+from actions import *
+
+
+def _rebuild(cls, values, loc):
+    return cls(*values, loc=loc)
+
+
+class Node:
+    """Immutable node
+
+    fields: names of the attributes, set once by `__init__`
+    loc: location in the source, or None
+    """
+    __slots__ = ('loc',)
+    fields = ()
+
+    def __init__(self, *values, loc=None):
+        if len(values) != len(self.fields):
+            raise TypeError(f'{type(self).__name__} expects the fields {self.fields}')
+        for name, value in zip(self.fields, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, 'loc', loc)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.fields)
+
+    def __reduce__(self):
+        return _rebuild, (type(self), self._values(), self.loc)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __hash__(self):
+        return hash((type(self), self._values()))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(map(repr, self._values()))})'
+
+    def __format__(self, spec):
+        # `p`: parenthesized
+        return f'({self})' if spec == 'p' else str(self)
+
+
+class Atom(Node):
+    __slots__ = fields = ('content',)
+    eval = AtomAction.eval
+    compile = AtomAction.compile
+    cost = AtomAction.cost
+
+    def __str__(self):
+        return self.content
+
+
+class Concept(Atom):
+    __slots__ = ()
+
+
+class Individual(Atom):
+    __slots__ = ()
+
+
+class Nominal(Node):
+    __slots__ = fields = ('individuals',)
+    eval = IndividualSetAction.eval
+    compile = IndividualSetAction.compile
+    cost = AtomAction.cost
+
+    def __str__(self):
+        return '{' + ', '.join(map(str, self.individuals)) + '}'
+
+
+class Quantifier(Node):
+    __slots__ = fields = ('content', 'num')
+    __call__ = QuantifierAction.__call__
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            return self.content == other
+        return Node.__eq__(self, other)
+
+    __hash__ = Node.__hash__
+
+    def __str__(self):
+        return self.content if self.num is None else f'{self.content} {self.num}'
+
+
+class RestrictionNode(Node):
+    __slots__ = fields = ('quantifier', 'relation', 'operand')
+    eval = RestrictionAction.eval
+    compile = RestrictionAction.compile
+    cost = RestrictionAction.cost
+
+    def __str__(self):
+        operand = f'{self.operand:p}' if isinstance(self.operand, Junction) else f'{self.operand}'
+        return f'{self.quantifier} {self.relation}. {operand}'
+
+
+class Negation(Node):
+    __slots__ = fields = ('function', 'operand')
+    eval = NegationAction.eval
+    compile = NegationAction.compile
+    cost = NegationAction.cost
+
+    def __str__(self):
+        operand = f'{self.operand:p}' if isinstance(self.operand, Junction) else f'{self.operand}'
+        return f'{self.function}{operand}'
+
+
+class Junction(Node):
+    # &, | or ^ of the operands `args`
+    __slots__ = fields = ('function', 'args')
+    eval = BinaryOperatorAction.eval
+    compile = BinaryOperatorAction.compile
+    cost = BinaryOperatorAction.cost
+
+    def __str__(self):
+        return f' {self.function} '.join(f'{arg:p}' if isinstance(arg, Junction) else f'{arg}' for arg in self.args)
+
+
+class ConceptTuple(Node):
+    __slots__ = fields = ('concepts',)
+
+    def eval(self, calculator):
+        # (named concepts, other concepts), as `ConceptTupleAction`
+        named = (Concept, ConceptAction)
+        return (tuple([c.eval(calculator) for c in self.concepts if isinstance(c, named)]),
+        tuple([c.eval(calculator) for c in self.concepts if not isinstance(c, named)]))
+
+    def __str__(self):
+        return ', '.join(map(str, self.concepts))
+
+
+class Declaration(Node):
+    # ! i : C
+    __slots__ = fields = ('lhs', 'base_concepts')
+    lhs_name = DeclarationAction.lhs_name
+    eval = DeclarationAction.eval
+    create = DeclarationAction.create
+    symbol = ':'
+
+    def __str__(self):
+        return f'! {self.lhs} {self.symbol} {self.base_concepts}'
+
+
+class ConceptDeclaration(Declaration):
+    # ! A :: B
+    __slots__ = ()
+    create = ConceptDeclarationAction.create
+    symbol = '::'
+
+
+class RelationDeclaration(Declaration):
+    __slots__ = ()
+    create = RelationDeclarationAction.create
+    symbol = '::'
+
+
+class Definition(Declaration):
+    # ! A := B
+    __slots__ = ()
+    create = DefinitionAction.create
+    symbol = ':='
+
+
+class Containing(Node):
+    # i : C
+    __slots__ = fields = ('individual', 'concept')
+    eval = ContainingFormulaAction.eval
+    compile = ContainingFormulaAction.compile
+
+    def __str__(self):
+        return f'{self.individual} : {self.concept}'
+
+
+class Comparison(Node):
+    # A <= B <= C ..., with the plan of its checks
+    __slots__ = fields = ('args', 'operators', 'plan')
+    eval = ComparisonFormulaAction.eval
+    compile = ComparisonFormulaAction.compile
+    explain = ComparisonFormulaAction.explain
+
+    def __str__(self):
+        s = str(self.args[0])
+        for op, arg in zip(self.operators, self.args[1:]):
+            s += f' {op} {arg}'
+        return s
+
+
+class SequenceNode(Node):
+    __slots__ = fields = ('tokens',)
+    eval = StatementSequenceAction.eval
+    compile = StatementSequenceAction.compile
+
+    def __str__(self):
+        return ';\n'.join(map(str, self.tokens))
+
+
+_lowerings = {}
+
+def lowering(action_class):
+    def decorator(f):
+        _lowerings[action_class] = f
+        return f
+    return decorator
+
+
+def lower(action):
+    """Lower a tree of actions into nodes
+
+    Actions without a node, e.g. variables, are kept as they are.
+    """
+    for cls in type(action).__mro__:
+        f = _lowerings.get(cls)
+        if f is not None:
+            return f(action, getattr(action, 'loc', None))
+    return action
+
+
+@lowering(ConceptAction)
+def _(action, loc):
+    return Concept(action.content, loc=loc)
+
+@lowering(IndividualAction)
+def _(action, loc):
+    return Individual(action.content, loc=loc)
+
+@lowering(IndividualSetAction)
+def _(action, loc):
+    return Nominal(tuple(lower(i) for i in action.individuals), loc=loc)
+
+@lowering(QuantifierAction)
+def _(action, loc):
+    return Quantifier(action.content, getattr(action, 'num', None), loc=loc)
+
+@lowering(RestrictionAction)
+def _(action, loc):
+    return RestrictionNode(lower(action.quantifier), str(action.relation), lower(action.operand), loc=loc)
+
+@lowering(NegationAction)
+def _(action, loc):
+    return Negation(action.function, lower(action.operand), loc=loc)
+
+@lowering(BinaryOperatorAction)
+def _(action, loc):
+    return Junction(action.function, tuple(lower(arg) for arg in action.args), loc=loc)
+
+@lowering(ConceptTupleAction)
+def _(action, loc):
+    return ConceptTuple(tuple(lower(c) for c in action.concepts), loc=loc)
+
+@lowering(DeclarationAction)
+def _(action, loc):
+    cls = {ConceptDeclarationAction: ConceptDeclaration, RelationDeclarationAction: RelationDeclaration,
+        DefinitionAction: Definition}.get(type(action), Declaration)
+    return cls(lower(action.lhs), lower(action.base_concepts), loc=loc)
+
+@lowering(ContainingFormulaAction)
+def _(action, loc):
+    return Containing(lower(action.individual), lower(action.concept), loc=loc)
+
+@lowering(ComparisonFormulaAction)
+def _(action, loc):
+    return Comparison(tuple(lower(arg) for arg in action.args), tuple(action.operators), tuple(action.plan), loc=loc)
+
+@lowering(StatementSequenceAction)
+def _(action, loc):
+    return SequenceNode(tuple(lower(token) for token in action.tokens), loc=loc)
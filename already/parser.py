@@ -9,97 +9,115 @@ names of individuals start with a lower letter
 An atomic concepts are concepts
 ~A, A|A, A & A, some r A, all r A, are concepts, where A is an concept
 
-i:A, A=A, A<=A, A>=A, A<A, A>A are formulas
+i:A, A=A, A<=A, A>=A, A<A, A>A are formulas,
+comparisons can be chained: A <= B < C
 
 ! i:A, ! A::B is declarations
 ! A:=B is a definition
+
+The grammar is built by `make_grammar` at the first call, not at import.
 """
 
+import functools
+import types
+
 import pyparsing as pp
 from actions import *
 from calculators import *
 
-concept = pp.Forward()
 
-atomic_concept = pp.pyparsing_common.identifier('content')
-atomic_concept.addParseAction(ConceptAction)
+@functools.lru_cache(maxsize=None)
+def make_grammar():
+    """Build the grammar of DLs once
+
+    Return a namespace of the parser elements,
+    e.g. `concept`, `statement`, `statement_sequence`
+    """
 
-type_check = pp.Suppress(':') + atomic_concept('type')
-individul = pp.pyparsing_common.identifier('content')
-individul.addParseAction(IndividualAction)
+    atomic_concept = pp.pyparsing_common.identifier('content')
+    atomic_concept.addParseAction(ConceptAction)
 
-individual_set = pp.Suppress('{') + pp.delimitedList(individul, ',') + pp.Suppress('}')
-atomic_concept_ = atomic_concept | individual_set.addParseAction(IndividualSetAction)
+    type_check = pp.Suppress(':') + atomic_concept('type')
+    individul = pp.pyparsing_common.identifier('content')
+    individul.addParseAction(IndividualAction)
 
-atomic_relation = pp.pyparsing_common.identifier
-quantifier = ((pp.Keyword('more') | pp.Keyword('less') | pp.Keyword('equal'))+pp.pyparsing_common.integer) \
-| pp.Keyword('some') | pp.Keyword('only')
-quantifier.addParseAction(QuantifierAction)
-restriction = quantifier('quantifier') + atomic_relation('relation') + pp.Suppress('.')
+    individual_set = pp.Suppress('{') + pp.delimitedList(individul, ',') + pp.Suppress('}')
+    atomic_concept_ = atomic_concept | individual_set.addParseAction(IndividualSetAction)
 
-r = restriction.parseString('only r. A')[0]
+    atomic_relation = pp.pyparsing_common.identifier
+    quantifier = ((pp.Keyword('more') | pp.Keyword('less') | pp.Keyword('equal'))+pp.pyparsing_common.integer) \
+    | pp.Keyword('some') | pp.Keyword('only')
+    quantifier.addParseAction(QuantifierAction)
+    restriction = quantifier('quantifier') + atomic_relation('relation') + pp.Suppress('.')
 
-individul_variable = pp.Combine('$' + individul)('name') + pp.Optional(type_check)
-concept_variable = pp.Combine('$' + atomic_concept)('name') + pp.Optional(type_check)
+    individul_variable = pp.Combine('$' + individul)('name') + pp.Optional(type_check)
+    concept_variable = pp.Combine('$' + atomic_concept)('name') + pp.Optional(type_check)
 
-individul_variable.addParseAction(IndividualVariableAction)
+    individul_variable.addParseAction(IndividualVariableAction)
 
-opList = [('~', 1, pp.opAssoc.RIGHT, NegationAction), 
-(restriction, 1, pp.opAssoc.RIGHT, RestrictionAction),
-('&', 2, pp.opAssoc.LEFT, AndAction), ('|', 2, pp.opAssoc.LEFT, OrAction), ('^', 2, pp.opAssoc.LEFT, XorAction)]
-concept = pp.infixNotation(atomic_concept_, opList)
+    opList = [('~', 1, pp.opAssoc.RIGHT, NegationAction),
+    (restriction, 1, pp.opAssoc.RIGHT, RestrictionAction),
+    ('&', 2, pp.opAssoc.LEFT, AndAction), ('|', 2, pp.opAssoc.LEFT, OrAction), ('^', 2, pp.opAssoc.LEFT, XorAction)]
+    concept = pp.infixNotation(atomic_concept_, opList)
 
-concept_tuple = pp.delimitedList(concept, ',')('concepts')
-concept_tuple.addParseAction(ConceptTupleAction)
+    concept_tuple = pp.delimitedList(concept, ',')('concepts')
+    concept_tuple.addParseAction(ConceptTupleAction)
 
-individual_declaration = pp.Suppress('!') + individul + pp.Suppress(':') + concept_tuple
-individual_declaration.addParseAction(DeclarationAction)
-concept_declaration = pp.Suppress('!') + concept + pp.Suppress('::') + concept_tuple
-concept_declaration.addParseAction(ConceptDeclarationAction)
-definition = pp.Suppress('!') + concept + pp.Suppress(':=') + concept
-definition.addParseAction(DefinitionAction) 
+    individual_declaration = pp.Suppress('!') + individul + pp.Suppress(':') + concept_tuple
+    individual_declaration.addParseAction(DeclarationAction)
+    concept_declaration = pp.Suppress('!') + concept + pp.Suppress('::') + concept_tuple
+    concept_declaration.addParseAction(ConceptDeclarationAction)
+    definition = pp.Suppress('!') + concept + pp.Suppress(':=') + concept
+    definition.addParseAction(DefinitionAction)
 
-mapping_formula = concept + '->' + concept
-mapping_formula.addParseAction(MappingFormulaAction)
-relation_tuple = (atomic_relation | mapping_formula)
-relation_declaration = pp.Suppress('!') + atomic_relation + pp.Suppress('::') + relation_tuple
-relation_declaration.addParseAction(RelationDeclarationAction)
+    mapping_formula = concept + '->' + concept
+    mapping_formula.addParseAction(MappingFormulaAction)
+    relation_tuple = (atomic_relation | mapping_formula)
+    relation_declaration = pp.Suppress('!') + atomic_relation + pp.Suppress('::') + relation_tuple
+    relation_declaration.addParseAction(RelationDeclarationAction)
 
-declaration = concept_declaration ^ definition ^ individual_declaration
+    declaration = concept_declaration ^ definition ^ individual_declaration
 
-containing_formula = individul + ':' + concept
-containing_formula.addParseAction(ContainingFormulaAction)
-compare = pp.oneOf(['<=', '>=', '==', '<', '>'])
-comparison_formula = concept + compare + concept
-comparison_formula.addParseAction(FormulaAction)
-formula = comparison_formula ^ containing_formula
+    containing_formula = individul + ':' + concept
+    containing_formula.addParseAction(ContainingFormulaAction)
+    compare = pp.oneOf(['<=', '>=', '==', '<', '>'])
+    comparison_formula = concept + pp.OneOrMore(compare + concept)
+    comparison_formula.addParseAction(ComparisonFormulaAction)
+    formula = comparison_formula ^ containing_formula
 
+    statement = declaration ^ formula
 
-statement = declaration ^ formula
+    # question = concept + compare + concept + pp.Suppress('?')
+    # sentence = question ^ formula
 
-# question = concept + compare + concept + pp.Suppress('?')
-# sentence = question ^ formula
+    statement_sequence = pp.delimitedList(statement, ';')
+    statement_sequence.addParseAction(StatementSequenceAction)
 
-statement_sequence = pp.delimitedList(statement, ';')
-statement_sequence.addParseAction(StatementSequenceAction)
+    return types.SimpleNamespace(concept=concept, restriction=restriction,
+        concept_tuple=concept_tuple, declaration=declaration,
+        relation_declaration=relation_declaration, formula=formula,
+        statement=statement, statement_sequence=statement_sequence)
 
 
 def parse(s:str):
-    return statement_sequence.parseString(s)[0]
+    return make_grammar().statement_sequence.parseString(s)[0]
+
+
+if __name__ == '__main__':
 
-from owlready2 import *
+    from owlready2 import *
 
-calc=OwlreadyCalculator()
-calc.set_constant('Thing', Thing)
+    calc=OwlreadyCalculator()
+    calc.set_constant('Thing', Thing)
 
-onto = get_ontology("http://test.org/onto.owl")
+    onto = get_ontology("http://test.org/onto.owl")
 
-with onto:
-    r = parse("""
-        ! I:: Thing;
-        ! J:: I;
-        ! i: I;
-        ! R :: I -> J;
-        """)
-    print(r.eval(calc))
-    print(calc.memory)
+    with onto:
+        r = parse("""
+            ! I:: Thing;
+            ! J:: I;
+            ! i: I;
+            ! R :: I -> J;
+            """)
+        print(r.eval(calc))
+        print(calc.memory)
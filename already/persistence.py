@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Warm start: the Owlready world and the state of a calculator in one SQLite file
+
+`save` moves the world to an SQLite backend, if it is not there yet,
+and writes in its table `already_state`:
+    calculator: the class of the calculator
+    memory, dictionary: the bindings of the calculator; entities by IRI,
+        constructs (And, Or, Not, OneOf, restrictions) by their structure,
+        bound methods of the calculator or of its ABox by name, the other values pickled
+    hierarchy: the classes of `hierarchy_index` by IRI, their ancestor bitsets and children
+    abox: the tables of the ABox index, if it is materialized
+`restore` attaches the world to the file and rebuilds the calculator from these tables,
+instead of replaying the scripts; Owlready loads the entities from the file.
+The caches of queries are not saved.
+
+usage:
+    with onto:
+        dl.parse(script).eval(calculator)
+    save(calculator, 'kb.sqlite3')
+    # in a new process
+    calculator = restore('kb.sqlite3')
+"""
+
+import pickle
+from array import array
+
+from owlready2 import *
+from hierarchy import links
+from utils import hierarchy_index, clear_caches
+from abox import ABoxIndex, RoleIndex
+
+FORMAT = 1
+TABLE = 'already_state'
+
+
+def encode(x, calculator):
+    """The value x, as a picklable tuple"""
+    if isinstance(x, (EntityClass, Thing)) and getattr(x, 'iri', None):
+        return 'iri', x.iri
+    elif isinstance(x, (And, Or)):
+        return type(x).__name__, [encode(c, calculator) for c in x.Classes]
+    elif isinstance(x, Not):
+        return 'Not', encode(x.Class, calculator)
+    elif isinstance(x, OneOf):
+        return 'OneOf', [encode(i, calculator) for i in x.instances]
+    elif isinstance(x, Inverse):
+        return 'Inverse', encode(x.property, calculator)
+    elif isinstance(x, Restriction):
+        return 'Restriction', encode(x.property, calculator), x.type, x.cardinality, encode(x.value, calculator)
+    owner = getattr(x, '__self__', None)
+    if owner is not None and owner is calculator:
+        return 'method', x.__func__.__name__
+    elif owner is not None and owner is getattr(calculator, 'abox', None):
+        return 'abox', x.__func__.__name__
+    return 'pickle', pickle.dumps(x, pickle.HIGHEST_PROTOCOL)
+
+
+def decode(value, world, calculator):
+    tag, *args = value
+    if tag == 'iri':
+        x = world[args[0]]
+        if x is None:
+            raise ValueError(f'{args[0]} is not in the world')
+        return x
+    elif tag in {'And', 'Or'}:
+        return {'And': And, 'Or': Or}[tag]([decode(c, world, calculator) for c in args[0]])
+    elif tag == 'Not':
+        return Not(decode(args[0], world, calculator))
+    elif tag == 'OneOf':
+        return OneOf([decode(i, world, calculator) for i in args[0]])
+    elif tag == 'Inverse':
+        return Inverse(decode(args[0], world, calculator))
+    elif tag == 'Restriction':
+        prop, type_, cardinality, v = args
+        return Restriction(decode(prop, world, calculator), type_, cardinality, decode(v, world, calculator))
+    elif tag == 'method':
+        return getattr(calculator, args[0])
+    elif tag == 'abox':
+        return getattr(calculator.abox, args[0])
+    return pickle.loads(args[0])
+
+
+def _bindings(d, calculator):
+    try:
+        return {k: encode(v, calculator) for k, v in d.items()}
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise TypeError(f'the bindings of the calculator could not be saved: {e}') from e
+
+
+def save(calculator, filename, world=default_world):
+    """Save the world and the state of the calculator in the SQLite file `filename`"""
+    if getattr(world.graph, 'filename', None) != filename:
+        world.set_backend(filename=filename)
+    state = {'format': FORMAT, 'calculator': type(calculator),
+        'memory': _bindings(dict(calculator.memory), calculator),
+        'dictionary': _bindings(calculator.dictionary, calculator),
+        'hierarchy': ([encode(klass, calculator) for klass in hierarchy_index.classes],
+            hierarchy_index.ancestors, hierarchy_index.children)}
+    abox = getattr(calculator, 'abox', None)
+    if abox is not None:
+        roles = []
+        for r, index in abox.roles.items():
+            index.compress()
+            roles.append((encode(r, calculator), index.indptr.tobytes(), index.indices.tobytes()))
+        state['abox'] = ([encode(i, calculator) for i in abox.individuals],
+            abox.extensions, abox.universe, roles, abox.cache.maxsize)
+    db = world.graph.db
+    db.execute(f'CREATE TABLE IF NOT EXISTS {TABLE} (key TEXT PRIMARY KEY, value BLOB)')
+    db.execute(f'DELETE FROM {TABLE}')
+    db.executemany(f'INSERT INTO {TABLE} VALUES (?, ?)',
+        [(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) for key, value in state.items()])
+    world.save()
+
+
+def _load_hierarchy(state, world, calculator):
+    classes, ancestors, children = state
+    hierarchy_index.classes = [decode(klass, world, calculator) for klass in classes]
+    hierarchy_index.ids = {klass: k for k, klass in enumerate(hierarchy_index.classes)}
+    hierarchy_index.ancestors = list(ancestors)
+    hierarchy_index.children = [list(c) for c in children]
+    hierarchy_index.links = [links(klass) for klass in hierarchy_index.classes]
+
+
+def _load_abox(state, world, calculator):
+    individuals, extensions, universe, roles, cache_size = state
+    abox = ABoxIndex(cache_size=cache_size, world=world)
+    abox.individuals = [decode(i, world, calculator) for i in individuals]
+    abox.ids = {i: k for k, i in enumerate(abox.individuals)}
+    abox.extensions = dict(extensions)
+    abox.universe = universe
+    for r, indptr, indices in roles:
+        index = RoleIndex()
+        index.indptr = array('q', indptr)
+        index.indices = array('q', indices)
+        abox.roles[decode(r, world, calculator)] = index
+    return abox
+
+
+def restore(filename, world=default_world):
+    """The calculator saved in the SQLite file `filename`, with its world
+
+    The world must be empty, e.g. `default_world` in a new process.
+    """
+    world.set_backend(filename=filename)
+    try:
+        rows = world.graph.db.execute(f'SELECT key, value FROM {TABLE}').fetchall()
+    except Exception as e:
+        raise ValueError(f'{filename} has no saved calculator') from e
+    state = {key: pickle.loads(value) for key, value in rows}
+    if state.get('format') != FORMAT:
+        raise ValueError(f'{filename} was saved in another format')
+    calculator = state['calculator']()
+    clear_caches()
+    _load_hierarchy(state['hierarchy'], world, calculator)
+    if 'abox' in state:
+        calculator.abox = _load_abox(state['abox'], world, calculator)
+        if hasattr(calculator, 'maintainer'):
+            calculator.maintainer.abox = calculator.abox
+    for k, v in state['dictionary'].items():
+        calculator.set_constant(k, decode(v, world, calculator))
+    calculator.memory.update((k, decode(v, world, calculator)) for k, v in state['memory'].items())
+    return calculator
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Cost-based ordering of checks
+
+A check has an estimated cost and a probability p to hold.
+In a conjunction, the checks are run by increasing cost / (1 - p),
+so that a failing check is met as early and as cheaply as possible;
+in a disjunction, by increasing cost / p.
+
+The estimates are rough and purely structural:
+a named class or a nominal is a lookup, a restriction walks the fillers.
+"""
+
+import functools
+
+from owlready2 import *
+
+
+# membership of an individual: base cost, probability to hold
+NAMED = 1, 0.3
+NOMINAL = 1, 0.1
+FILLERS = 8    # cost of getting the fillers of an individual
+FANOUT = 4     # number of fillers to check, in average
+RESTRICTIONS = {SOME: 0.3, ONLY: 0.7, VALUE: 0.1, MIN: 0.3, MAX: 0.7, EXACTLY: 0.2}
+
+# comparison of concepts: cost of the check, probability to hold
+OPERATORS = {'==': (1, 0.1), '<=': (2, 0.5), '>=': (2, 0.5), '=>': (2, 0.5), '<': (4, 0.4), '>': (4, 0.4)}
+
+
+def _estimate(c):
+    if isinstance(c, ThingClass):
+        return NAMED
+    elif isinstance(c, OneOf):
+        return NOMINAL
+    elif isinstance(c, Not):
+        cost, p = estimate(c.Class)
+        return cost, 1 - p
+    elif isinstance(c, And):
+        estimates = [estimate(cc) for cc in c.Classes]
+        return sum(cost for cost, _ in estimates), functools.reduce(lambda q, e: q * e[1], estimates, 1)
+    elif isinstance(c, Or):
+        estimates = [estimate(cc) for cc in c.Classes]
+        return sum(cost for cost, _ in estimates), 1 - functools.reduce(lambda q, e: q * (1 - e[1]), estimates, 1)
+    elif isinstance(c, Restriction):
+        p = RESTRICTIONS.get(c.type, 0.5)
+        if c.type == VALUE or not isinstance(c.value, (ThingClass, Construct)):
+            return FILLERS, p
+        return FILLERS + FANOUT * estimate(c.value)[0], p
+    return NAMED
+
+
+_estimates = {}
+
+def estimate(c):
+    """Estimated cost and probability to hold of `is_instance_of(i, c)`"""
+    try:
+        return _estimates[c]
+    except KeyError:
+        e = _estimates[c] = _estimate(c)
+        if len(_estimates) > 1 << 14:
+            _estimates.clear()
+        return e
+    except TypeError:
+        # unhashable
+        return _estimate(c)
+
+
+def rank(cost, p, conjunctive=True):
+    q = 1 - p if conjunctive else p
+    return cost / q if q > 0 else float('inf')
+
+
+def order(cs, conjunctive=True):
+    """The concepts `cs` in the order of their checks
+
+    conjunctive: the checks of a conjunction (all), or of a disjunction (any)
+    """
+    if len(cs) < 2:
+        return cs
+    return sorted(cs, key=lambda c: rank(*estimate(c), conjunctive))
+
+
+def plan_chain(costs, operators):
+    """The order of the checks of a chain `A0 op1 A1 op2 A2 ...`
+
+    costs: estimated cost of evaluating each operand
+    operators: the operator of each pair of neighbouring operands
+
+    Every operand is evaluated once, when a check needs it for the first time,
+    so the cost of a check is the cost of its operands not yet evaluated plus its own cost.
+    The cheapest and most selective check is chosen first, greedily.
+    Return [(k, cost), ...] where k is the index of the pair (A_k, A_k+1).
+    """
+    evaluated = set()
+    remaining = list(range(len(operators)))
+    plan = []
+    while remaining:
+        def marginal(k):
+            check, _ = OPERATORS.get(operators[k], (2, 0.5))
+            return check + sum(costs[j] for j in (k, k + 1) if j not in evaluated)
+        k = min(remaining, key=lambda k: rank(marginal(k), OPERATORS.get(operators[k], (2, 0.5))[1]))
+        plan.append((k, marginal(k)))
+        evaluated.update((k, k + 1))
+        remaining.remove(k)
+    return plan
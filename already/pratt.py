@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Hand-written parser of DLs, an alternative backend to the grammar of `parser`
+
+The source is tokenized in one pass, then parsed by precedence climbing,
+one function per level of operators, as `pp.infixNotation`:
+    ~, some r. ...  prefixes, binding tighter than the binary operators
+    &, |, ^         left binary, `A & B & C` is one `AndAction` of 3 operands
+It builds the same actions as the grammar, with tokens shaped as pyparsing shapes them,
+and follows the same rules: the actions run once a statement is parsed,
+the sequence stops at the first statement that cannot be parsed,
+and a name is checked by its action (e.g. `ConceptAction`), not by the parser.
+
+usage:
+    DL(backend='pratt'), or parse(s)
+    differences(s): the differences with the grammar, see benchmarks/pratt.py
+"""
+
+import re
+import types
+
+import pyparsing as pp
+from actions import *
+
+
+def _chars(s):
+    return ''.join(re.escape(c) for c in s)
+
+TOKEN = re.compile(r'(?P<ws>[ \t\n\r]+)'
+    rf'|(?P<ident>[{_chars(pp.identchars)}][{_chars(pp.identbodychars)}]*)'
+    r'|(?P<int>[0-9]+)'
+    r'|(?P<op>::|:=|<=|>=|==|->|[:<>~&|^(){},;!.])'
+    r'|(?P<error>.)', re.S)
+
+QUANTIFIERS = {'some', 'only', 'more', 'less', 'equal'}
+COUNTED = {'more', 'less', 'equal'}
+COMPARE = {'<=', '>=', '==', '<', '>'}
+# from the tightest to the loosest
+BINARY = (('&', AndAction), ('|', OrAction), ('^', XorAction))
+
+
+def tokenize(s):
+    """[(kind, text, location), ...], ending with ('end', '', len(s))"""
+    tokens = [(m.lastgroup, m.group(), m.start()) for m in TOKEN.finditer(s) if m.lastgroup != 'ws']
+    tokens.append(('end', '', len(s)))
+    return tokens
+
+
+def results(tokens, **names):
+    # ParseResults with named results, as passed to the actions
+    r = pp.ParseResults(tokens)
+    for name, value in names.items():
+        r[name] = value
+    return r
+
+
+class Parser:
+    """Parser of one source
+
+    The methods parse a rule from the current token, and raise `pp.ParseException`
+    on failure; the rules with alternatives backtrack by restoring `self.k`.
+    As pyparsing chooses a statement before running its actions,
+    a rule returns a function that builds its action, called once the statement is parsed.
+    """
+
+    def __init__(self, s):
+        # as pyparsing does
+        self.s = s.expandtabs()
+        self.tokens = tokenize(self.s)
+        self.k = 0
+
+    def peek(self, offset=0):
+        return self.tokens[min(self.k + offset, len(self.tokens) - 1)]
+
+    def is_op(self, text, offset=0):
+        kind, value, _ = self.peek(offset)
+        return kind == 'op' and value == text
+
+    def fail(self, expected):
+        _, text, loc = self.peek()
+        raise pp.ParseException(self.s, loc, f'Expected {expected}, found {text!r}')
+
+    def expect(self, text):
+        if not self.is_op(text):
+            self.fail(repr(text))
+        self.k += 1
+
+    def identifier(self):
+        kind, text, loc = self.peek()
+        if kind != 'ident':
+            self.fail('identifier')
+        self.k += 1
+        return text, loc
+
+    def individual(self):
+        text, loc = self.identifier()
+        return lambda: IndividualAction(self.s, loc, results([text], content=text))
+
+    # concepts
+
+    def concept(self, level=len(BINARY) - 1):
+        """binary operators of `BINARY[level]` and tighter
+
+        An operator must be followed by an operand, there is no backtracking.
+        """
+        if level < 0:
+            return self.prefixed()
+        first = self.concept(level - 1)
+        symbol, action = BINARY[level]
+        if not self.is_op(symbol):
+            return first
+        # the location of the first operator, as pyparsing does
+        loc = self.peek()[2]
+        items = [first]
+        while self.is_op(symbol):
+            self.k += 1
+            items += [symbol, self.concept(level - 1)]
+        return lambda: action(self.s, loc, results([results([x if isinstance(x, str) else x() for x in items])]))
+
+    def prefixed(self):
+        # ~ and restrictions, that bind tighter than the binary operators
+        kind, text, loc = self.peek()
+        if kind == 'op' and text == '~':
+            self.k += 1
+            operand = self.prefixed()
+            return lambda: NegationAction(self.s, loc, results([results(['~', operand()])]))
+        if kind == 'ident' and text in QUANTIFIERS:
+            save = self.k
+            try:
+                self.k += 1
+                tokens = [text]
+                if text in COUNTED:
+                    kind, number, _ = self.peek()
+                    if kind != 'int':
+                        self.fail('integer')
+                    self.k += 1
+                    tokens.append(int(number))
+                relation, _ = self.identifier()
+                self.expect('.')
+            except pp.ParseException:
+                # e.g. `some` alone, an atom
+                self.k = save
+            else:
+                operand = self.prefixed()
+                def restriction():
+                    quantifier = QuantifierAction(self.s, loc, results(tokens, quantifier=text))
+                    return RestrictionAction(self.s, loc, results([results([quantifier, relation, operand()])]))
+                return restriction
+        return self.atom()
+
+    def atom(self):
+        kind, text, loc = self.peek()
+        if kind == 'ident':
+            self.k += 1
+            return lambda: ConceptAction(self.s, loc, results([text], content=text))
+        elif self.is_op('{'):
+            self.k += 1
+            individuals = [self.individual()]
+            while self.is_op(','):
+                self.k += 1
+                individuals.append(self.individual())
+            self.expect('}')
+            def individual_set():
+                tokens = [i() for i in individuals]
+                return IndividualSetAction(self.s, loc, results(tokens, content=tokens[-1]))
+            return individual_set
+        elif self.is_op('('):
+            self.k += 1
+            concept = self.concept()
+            self.expect(')')
+            return concept
+        self.fail('concept')
+
+    def concept_tuple(self):
+        loc = self.peek()[2]
+        concepts = [self.concept()]
+        while self.is_op(','):
+            save = self.k
+            self.k += 1
+            try:
+                concepts.append(self.concept())
+            except pp.ParseException:
+                self.k = save
+                break
+        def concept_tuple():
+            tokens = [c() for c in concepts]
+            return ConceptTupleAction(self.s, loc, results(tokens, concepts=results(tokens)))
+        return concept_tuple
+
+    # statements
+
+    def declaration(self):
+        loc = self.peek()[2]
+        self.expect('!')
+        if self.peek()[0] == 'ident' and self.is_op(':', 1):
+            individual = self.individual()
+            self.k += 1
+            concepts = self.concept_tuple()
+            def declaration():
+                i, t = individual(), concepts()
+                return DeclarationAction(self.s, loc, results([i, t], content=i, concepts=t))
+            return declaration
+        lhs = self.concept()
+        if self.is_op('::'):
+            self.k += 1
+            concepts = self.concept_tuple()
+            def declaration():
+                c, t = lhs(), concepts()
+                return ConceptDeclarationAction(self.s, loc, results([c, t], concepts=t))
+            return declaration
+        elif self.is_op(':='):
+            self.k += 1
+            rhs = self.concept()
+            return lambda: DefinitionAction(self.s, loc, results([lhs(), rhs()]))
+        self.fail("'::' or ':='")
+
+    def formula(self):
+        loc = self.peek()[2]
+        if self.peek()[0] == 'ident' and self.is_op(':', 1):
+            individual = self.individual()
+            self.k += 1
+            concept = self.concept()
+            def containing():
+                i = individual()
+                return ContainingFormulaAction(self.s, loc, results([i, ':', concept()], content=i))
+            return containing
+        items = [self.concept()]
+        while self.peek()[0] == 'op' and self.peek()[1] in COMPARE:
+            save = self.k
+            op = self.peek()[1]
+            self.k += 1
+            try:
+                operand = self.concept()
+            except pp.ParseException:
+                self.k = save
+                break
+            items += [op, operand]
+        if len(items) == 1:
+            self.fail('comparison')
+        return lambda: ComparisonFormulaAction(self.s, loc, results([x if isinstance(x, str) else x() for x in items]))
+
+    def statement(self):
+        if self.is_op('!'):
+            return self.declaration()()
+        return self.formula()()
+
+    def statement_sequence(self):
+        loc = self.peek()[2]
+        statements = [self.statement()]
+        while self.is_op(';'):
+            save = self.k
+            self.k += 1
+            try:
+                statements.append(self.statement())
+            except pp.ParseException:
+                self.k = save
+                break
+        return StatementSequenceAction(self.s, loc, results(statements))
+
+    def parse_concept(self):
+        return self.concept()()
+
+
+class Element:
+    """A rule of `Parser`, used as a pyparsing element by `BaseLanguage`"""
+
+    def __init__(self, rule):
+        self.rule = rule
+
+    def parseString(self, s, parseAll=False):
+        parser = Parser(s)
+        tree = getattr(parser, self.rule)()
+        if parseAll and parser.peek()[0] != 'end':
+            parser.fail('end of text')
+        return [tree]
+
+    def matches(self, s, parseAll=True):
+        try:
+            self.parseString(s, parseAll)
+            return True
+        except pp.ParseBaseException:
+            return False
+
+
+def make_grammar():
+    # the rules used by `BaseLanguage`, as `parser.make_grammar`
+    return types.SimpleNamespace(concept=Element('parse_concept'), statement=Element('statement'),
+        statement_sequence=Element('statement_sequence'))
+
+
+def parse(s):
+    return Parser(s).statement_sequence()
+
+
+def _differences(a, b, path, out):
+    if isinstance(a, pp.ParseResults) or isinstance(b, pp.ParseResults):
+        if not (isinstance(a, pp.ParseResults) and isinstance(b, pp.ParseResults)):
+            out.append(f'{path}: {type(a).__name__} != {type(b).__name__}')
+        elif len(a) != len(b) or set(a.keys()) != set(b.keys()):
+            out.append(f'{path}: {a.asList()} {list(a.keys())} != {b.asList()} {list(b.keys())}')
+        else:
+            for k, (x, y) in enumerate(zip(a, b)):
+                _differences(x, y, f'{path}[{k}]', out)
+        return
+    if type(a) is not type(b):
+        out.append(f'{path}: {type(a).__name__} != {type(b).__name__}')
+    elif isinstance(a, ppx.BaseAction):
+        # the location of binary operators depends on the version of pyparsing
+        if not isinstance(a, ppx.BinaryOperatorAction) and getattr(a, 'loc', None) != getattr(b, 'loc', None):
+            out.append(f'{path}: {type(a).__name__} at {a.loc} != {b.loc}')
+        if hasattr(a, 'tokens'):
+            _differences(a.tokens, b.tokens, f'{path}.{type(a).__name__}', out)
+    elif a != b:
+        out.append(f'{path}: {a!r} != {b!r}')
+
+
+def differences(s, grammar=None):
+    """Parse `s` with the grammar of `parser` and with `Parser`
+
+    Return the list of the differences between the trees, empty if they are the same;
+    both parsers should also fail with the same type of exception.
+    """
+    if grammar is None:
+        from parser import make_grammar
+        grammar = make_grammar().statement_sequence
+    trees = []
+    for f in (lambda: grammar.parseString(s)[0], lambda: parse(s)):
+        try:
+            trees.append(f())
+        except Exception as e:
+            trees.append(e)
+    a, b = trees
+    if isinstance(a, Exception) or isinstance(b, Exception):
+        if type(a) is type(b) or isinstance(a, pp.ParseBaseException) and isinstance(b, pp.ParseBaseException):
+            return []
+        return [f'{type(a).__name__} != {type(b).__name__}']
+    out = []
+    _differences(a, b, '', out)
+    return out
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Opt-in profiling of evaluations
+
+`Profiler.enable` wraps the `eval` methods of the actions, the operators of a calculator
+and `is_a`/`is_instance_of`; `disable` puts the originals back,
+so nothing is paid when the profiler is off.
+Compiled functions (`compile_action`) do not call `eval`: only their operators
+and `is_a`/`is_instance_of` are recorded, if they were compiled while the profiler was enabled.
+
+It records
+- calls and cumulative time of each action type and operator,
+- calls and cumulative time of each statement, by its location in the source
+  (with lean nodes, that do not keep the source, by its location and its text),
+- calls and maximal recursion depth of `is_a` and `is_instance_of`,
+- self time of each stack of calls, in the collapsed format of flame graphs.
+
+usage:
+    with Profiler(calculator) as profiler:
+        tree.eval(calculator)
+    print(profiler.report())
+    profiler.dump_stacks('stacks.txt')  # flamegraph.pl stacks.txt > flame.svg
+"""
+
+import functools
+import sys
+import time
+from collections import defaultdict
+
+import pyparsing_ext as ppx
+import actions
+import calculators
+import nodes
+import utils
+
+SEQUENCES = (actions.StatementSequenceAction, nodes.SequenceNode)
+
+
+def action_classes(module=actions, base=ppx.BaseAction):
+    # action classes defining their own `eval`
+    return [c for c in vars(module).values()
+        if isinstance(c, type) and issubclass(c, base) and 'eval' in c.__dict__]
+
+
+class Profiler:
+    """Profiler of evaluations
+
+    calls, times: name -> number of calls, cumulative time
+    statements: source location -> [calls, cumulative time]
+    depths: name -> maximal recursion depth, for `is_a`/`is_instance_of`
+    stacks: collapsed stack -> self time
+    """
+
+    def __init__(self, calculator=None, classes=None):
+        self.calculator = calculator
+        self.classes = action_classes() + action_classes(nodes, nodes.Node) if classes is None else classes
+        self.calls = defaultdict(int)
+        self.times = defaultdict(float)
+        self.statements = defaultdict(lambda: [0, 0.])
+        self.depths = defaultdict(int)
+        self.stacks = defaultdict(float)
+        self._stack = []
+        self._depth = defaultdict(int)
+        # (depth of the stack, source) of the statement sequences being evaluated
+        self._sequences = []
+        self._patches = []
+
+    def _call(self, name, f, args, statement=None):
+        outermost = self._depth[name] == 0
+        self._depth[name] += 1
+        self.depths[name] = max(self.depths[name], self._depth[name])
+        frame = [name, 0.]
+        self._stack.append(frame)
+        t = time.perf_counter()
+        try:
+            return f(*args)
+        finally:
+            dt = time.perf_counter() - t
+            self._stack.pop()
+            self._depth[name] -= 1
+            self.calls[name] += 1
+            if outermost:
+                self.times[name] += dt
+            self.stacks[';'.join([caller for caller, _ in self._stack] + [name])] += dt - frame[1]
+            if self._stack:
+                self._stack[-1][1] += dt
+            if statement is not None:
+                record = self.statements[statement]
+                record[0] += 1
+                record[1] += dt
+
+    def _is_statement(self):
+        # an action evaluated at the top, or by a statement sequence
+        if self._sequences:
+            return self._sequences[-1][0] == len(self._stack)
+        return not self._stack
+
+    def _statement(self, action):
+        # location and text of a statement, from the source of the action or of its sequence
+        loc = getattr(action, 'loc', None)
+        source = getattr(action, 'instring', None) or (self._sequences[-1][1] if self._sequences else None)
+        if loc is None or not source:
+            text = str(action)
+        else:
+            end = source.find(';', loc)
+            text = source[loc:end if end >= 0 else None]
+        return f'{"?" if loc is None else loc}: ' + ' '.join(text.split())
+
+    def _wrap_eval(self, cls, f):
+        @functools.wraps(f)
+        def eval(action, *args, **kwargs):
+            name = type(action).__name__
+            if isinstance(action, SEQUENCES):
+                self._sequences.append((len(self._stack) + 1, getattr(action, 'instring', None)))
+                try:
+                    return self._call(name, lambda *args: f(action, *args, **kwargs), args)
+                finally:
+                    self._sequences.pop()
+            statement = self._statement(action) if self._is_statement() else None
+            return self._call(name, lambda *args: f(action, *args, **kwargs), args, statement)
+        return eval
+
+    def _wrap(self, name, f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            return self._call(name, lambda *args: f(*args, **kwargs), args)
+        return wrapper
+
+    def _patch(self, owner, key, value):
+        if isinstance(owner, dict):
+            self._patches.append((owner, key, owner[key]))
+            owner[key] = value
+        else:
+            self._patches.append((owner, key, getattr(owner, key)))
+            setattr(owner, key, value)
+
+    def enable(self):
+        if self._patches:
+            return self
+        for cls in self.classes:
+            self._patch(cls, 'eval', self._wrap_eval(cls, cls.__dict__['eval']))
+        originals = {utils.is_a: 'is_a', utils.is_instance_of: 'is_instance_of'}
+        wrappers = {f: self._wrap(name, f) for f, name in originals.items()}
+        modules = [utils, calculators, actions] + [sys.modules[m] for m in ('abox',) if m in sys.modules]
+        for module in modules:
+            for f, name in originals.items():
+                if getattr(module, name, None) is f:
+                    self._patch(module, name, wrappers[f])
+        if self.calculator is not None:
+            for op, f in list(self.calculator.dictionary.items()):
+                if callable(f) and not isinstance(f, type):
+                    self._patch(self.calculator.dictionary, op, wrappers.get(f) or self._wrap(f'op:{op}', f))
+        return self
+
+    def disable(self):
+        while self._patches:
+            owner, key, value = self._patches.pop()
+            if isinstance(owner, dict):
+                owner[key] = value
+            else:
+                setattr(owner, key, value)
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *args):
+        self.disable()
+
+    def report(self, top=20):
+        lines = [f'{"name":<32}{"calls":>10}{"time (s)":>12}{"max depth":>12}']
+        for name in sorted(self.calls, key=self.times.get, reverse=True):
+            lines.append(f'{name:<32}{self.calls[name]:>10}{self.times[name]:>12.6f}{self.depths[name]:>12}')
+        lines.append('')
+        lines.append(f'{"statement":<54}{"calls":>10}{"time (s)":>12}')
+        for statement, (calls, t) in sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:top]:
+            lines.append(f'{statement[:52]:<54}{calls:>10}{t:>12.6f}')
+        return '\n'.join(lines)
+
+    def dump_stacks(self, filename):
+        # collapsed stacks, with self times in microseconds, for flamegraph.pl or speedscope
+        with open(filename, 'w') as fo:
+            for stack, t in self.stacks.items():
+                fo.write(f'{stack} {round(t * 1e6)}\n')
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Asyncio server of questions in DLs
+
+The protocol is one JSON object per line:
+    --> {"id": 1, "question": "i : A & some r. B"}
+    <-- {"id": 1, "respond": true}
+    <-- {"id": 2, "error": "..."}
+
+Questions are parsed and evaluated against a shared calculator.
+Requests can be pipelined, the responds of a connection come back in order.
+Concurrent questions, from all connections, are answered by batches
+in an executor, so that the event loop is never blocked by reasoning.
+
+communication diagram:
+            Question           batch            eval
+[:Client]  ---------> [:Server] -----> [executor] -----> [calculator]
+           <---------
+             Respond
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dialogue import Question, Respond
+from language import DL
+
+
+def jsonable(x):
+    if x is None or isinstance(x, (bool, int, float, str)):
+        return x
+    elif isinstance(x, (list, tuple, set)):
+        return [jsonable(xi) for xi in x]
+    return str(x)
+
+
+class Server:
+    """Server of questions
+
+    calculator: the shared calculator
+    ontology: where the declarations in questions create entities
+    language: the language of questions, a `DL` with a cache of parsed trees by default
+    batch_size, batch_delay: a batch is answered when it is full or after the delay (seconds)
+    executor: where the questions are answered; one thread by default,
+    since the calculator and Owlready are not thread-safe
+    """
+
+    def __init__(self, calculator, ontology=None, language=None, batch_size=64, batch_delay=0.001, executor=None):
+        self.calculator = calculator
+        self.ontology = ontology
+        self.language = DL(cache_size=1024) if language is None else language
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.executor = ThreadPoolExecutor(max_workers=1) if executor is None else executor
+        self.queue = None
+
+    def answer(self, question):
+        try:
+            return Respond(self.language.parse(question.content).eval(self.calculator))
+        except Exception as e:
+            return Respond(e)
+
+    def answer_batch(self, questions):
+        if self.ontology is None:
+            return [self.answer(question) for question in questions]
+        with self.ontology:
+            return [self.answer(question) for question in questions]
+
+    async def ask(self, question):
+        # the respond to a question, answered in the next batch
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((question, future))
+        return await future
+
+    async def batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            questions = [question for question, _ in batch]
+            try:
+                responds = await loop.run_in_executor(self.executor, self.answer_batch, questions)
+            except Exception as e:
+                responds = [Respond(e)] * len(batch)
+            for (_, future), respond in zip(batch, responds):
+                if not future.done():
+                    future.set_result(respond)
+
+    async def handle(self, reader, writer):
+        # requests are read while the former ones are answered
+        pending = asyncio.Queue()
+
+        async def respond():
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                id_, task = item
+                message = {'id': id_}
+                content = (await task).content
+                if isinstance(content, Exception):
+                    message['error'] = f'{type(content).__name__}: {content}'
+                else:
+                    message['respond'] = jsonable(content)
+                writer.write(json.dumps(message).encode() + b'\n')
+                await writer.drain()
+
+        responder = asyncio.create_task(respond())
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    id_, question = request.get('id'), Question(request['question'])
+                except (ValueError, KeyError, AttributeError) as e:
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result(Respond(e))
+                    await pending.put((None, future))
+                    continue
+                await pending.put((id_, asyncio.create_task(self.ask(question))))
+            await pending.put(None)
+            await responder
+        except asyncio.CancelledError:
+            # the server is closing
+            responder.cancel()
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None):
+        """Serve on TCP, or on the Unix socket `path`"""
+        self.queue = asyncio.Queue()
+        batcher = asyncio.create_task(self.batcher())
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+class Client:
+    """Client of `Server`, requests are pipelined"""
+
+    def __init__(self):
+        self.ids = itertools.count()
+        self.futures = {}
+
+    async def connect(self, host='127.0.0.1', port=8765, path=None):
+        if path:
+            self.reader, self.writer = await asyncio.open_unix_connection(path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.listener = asyncio.create_task(self.listen())
+        return self
+
+    async def listen(self):
+        try:
+            async for line in self.reader:
+                message = json.loads(line)
+                future = self.futures.pop(message.get('id'), None)
+                if future is not None:
+                    future.set_result(message)
+        finally:
+            self.fail(ConnectionError('connection closed'))
+
+    def fail(self, error):
+        # the pending questions will not be answered
+        futures, self.futures = self.futures, {}
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def ask(self, question):
+        """Send a question, return the message of the respond"""
+        if self.listener.done():
+            raise ConnectionError('connection closed')
+        id_ = next(self.ids)
+        future = self.futures[id_] = asyncio.get_running_loop().create_future()
+        self.writer.write(json.dumps({'id': id_, 'question': question}).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+        self.fail(ConnectionError('client closed'))
+
+
+async def load_test(questions, connections=4, requests=1000, host='127.0.0.1', port=8765, path=None):
+    """Send `requests` questions over `connections` pipelined connections
+
+    Return the throughput and the latency percentiles
+    """
+    clients = [await Client().connect(host, port, path) for _ in range(connections)]
+    latencies = []
+
+    async def timed(client, question):
+        t = time.perf_counter()
+        message = await client.ask(question)
+        latencies.append(time.perf_counter() - t)
+        return message
+
+    t = time.perf_counter()
+    messages = await asyncio.gather(*(timed(clients[k % connections], questions[k % len(questions)])
+        for k in range(requests)))
+    elapsed = time.perf_counter() - t
+    for client in clients:
+        await client.close()
+    latencies.sort()
+    return {'requests': requests, 'connections': connections, 'seconds': elapsed,
+        'requests_per_second': requests / elapsed,
+        'errors': sum('error' in message for message in messages),
+        'latency': {f'p{p}': latencies[min(len(latencies) - 1, len(latencies) * p // 100)] for p in (50, 90, 99)}}
+
+
+if __name__ == '__main__':
+    import argparse
+    from calculators import *
+
+    parser = argparse.ArgumentParser(description='serve questions in DLs, or load-test a server')
+    parser.add_argument('scripts', nargs='*', help='DL scripts evaluated before serving')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--path', help='Unix socket')
+    parser.add_argument('--load', help='file of questions, one per line, to load-test a running server')
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.load:
+        with open(args.load) as fo:
+            questions = [line.strip() for line in fo if line.strip()]
+        print(json.dumps(asyncio.run(load_test(questions, args.connections, args.requests,
+            args.host, args.port, args.path)), indent=2))
+    else:
+        calculator = OwlreadyCalculator()
+        calculator.set_constant('Thing', Thing)
+        onto = get_ontology('http://already.org/server.owl')
+        dl = DL()
+        with onto:
+            for script in args.scripts:
+                for _ in dl.iterEvalFile(script, calculator):
+                    pass
+        asyncio.run(Server(calculator, onto).serve(args.host, args.port, args.path))
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Frozen snapshot of the derived state, shared read-only by worker processes
+
+`export` writes the tables of `HierarchyIndex` and `ABoxIndex` in one flat buffer,
+a file or a `multiprocessing.shared_memory` block:
+    names: of the classes, the individuals and the object properties,
+           by id, and their ids sorted by name for the lookups
+    ancestors: one bitset per class, over the classes
+    extensions: one bitset per class, over the individuals
+    roles: the adjacency of every object property, in CSR form
+The sections are 8-byte aligned, after a header and a table of (offset, length).
+
+`Snapshot` reads the buffer in place, through memoryviews, and answers
+`is_a` and `is_instance_of` by names, under the closed-world assumption of `ABoxIndex`.
+It does not need Owlready, this module does not import it.
+Concepts are names of classes, or tuples:
+    ('and', C, D, ...), ('or', C, D, ...), ('not', C), ('one_of', i, j, ...),
+    ('some', r, C), ('only', r, C), ('value', r, i), ('min'|'max'|'exactly', n, r, C)
+
+usage:
+    shm = calculator.export_snapshot(ontology=onto)     # or export_snapshot('kb.snapshot')
+    # in a worker
+    snapshot = Snapshot.attach(shm.name)                # or Snapshot.open('kb.snapshot')
+    snapshot.is_a('Dog', 'Animal')
+    snapshot.is_instance_of('rex', ('some', 'owns', 'Bone'))
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from itertools import accumulate
+from multiprocessing import shared_memory
+
+MAGIC = b'DLS\0'
+FORMAT = 1
+# magic, format, numbers of classes, individuals and roles
+HEADER = struct.Struct('<4sHQQQ')
+SECTIONS = ('class_names', 'class_offsets', 'class_order',
+    'individual_names', 'individual_offsets', 'individual_order',
+    'role_names', 'role_offsets', 'role_order',
+    'ancestors', 'extensions', 'role_start', 'role_indptr', 'role_indices')
+TABLE = struct.Struct('<' + 'QQ' * len(SECTIONS))
+ARRAYS = {'class_offsets': 'Q', 'class_order': 'Q', 'individual_offsets': 'Q', 'individual_order': 'Q',
+    'role_offsets': 'Q', 'role_order': 'Q', 'role_start': 'q', 'role_indptr': 'q', 'role_indices': 'q'}
+
+
+# as `hierarchy.iter_bits` and `hierarchy.bitset`, that import owlready2
+
+def iter_bits(bits):
+    for k, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+        while byte:
+            low = byte & -byte
+            yield k << 3 | low.bit_length() - 1
+            byte ^= low
+
+
+def bitset(positions):
+    positions = list(positions)
+    data = bytearray((max(positions, default=-1) >> 3) + 1)
+    for k in positions:
+        data[k >> 3] |= 1 << (k & 7)
+    return int.from_bytes(data, 'little')
+
+
+def row_size(n):
+    # bytes of a bitset of n bits, in whole words
+    return (n + 63) // 64 * 8
+
+
+def _names(names):
+    # the names, where they end, and the ids sorted by name
+    encoded = [name.encode() for name in names]
+    offsets = array('Q', [0])
+    offsets.extend(accumulate(map(len, encoded)))
+    order = array('Q', sorted(range(len(encoded)), key=lambda k: (encoded[k], k)))
+    return b''.join(encoded), offsets.tobytes(), order.tobytes()
+
+
+def _rows(bitsets, size):
+    return b''.join(bits.to_bytes(size, 'little') for bits in bitsets)
+
+
+def build(classes, ancestors, individuals, extensions, roles):
+    """The bytes of a snapshot
+
+    classes, individuals: names, by id
+    ancestors, extensions: bitsets, by class id
+    roles: (name, indptr, indices) of the object properties, as `RoleIndex`
+    """
+    n = len(individuals)
+    sections = {}
+    for kind, names in (('class', classes), ('individual', individuals), ('role', [r[0] for r in roles])):
+        sections[f'{kind}_names'], sections[f'{kind}_offsets'], sections[f'{kind}_order'] = _names(names)
+    sections['ancestors'] = _rows(ancestors, row_size(len(classes)))
+    sections['extensions'] = _rows(extensions, row_size(n))
+    start, indptrs, indices = array('q', [0]), array('q'), array('q')
+    for _, indptr, row_indices in roles:
+        indptr = list(indptr[:n+1])
+        # subjects without fillers at the end
+        indptr += [indptr[-1]] * (n + 1 - len(indptr))
+        indptrs.extend(indptr)
+        indices.extend(row_indices)
+        start.append(len(indices))
+    sections['role_start'], sections['role_indptr'], sections['role_indices'] = \
+    start.tobytes(), indptrs.tobytes(), indices.tobytes()
+
+    table, offset = [], HEADER.size + TABLE.size
+    for name in SECTIONS:
+        offset = (offset + 7) // 8 * 8
+        table += [offset, len(sections[name])]
+        offset += len(sections[name])
+    data = bytearray(offset)
+    HEADER.pack_into(data, 0, MAGIC, FORMAT, len(classes), n, len(roles))
+    TABLE.pack_into(data, HEADER.size, *table)
+    for name, offset in zip(SECTIONS, table[::2]):
+        data[offset:offset+len(sections[name])] = sections[name]
+    return data
+
+
+def export(hierarchy, abox, properties=(), filename=None):
+    """Export the hierarchy and the ABox
+
+    properties: the object properties whose adjacency is exported
+    Write the snapshot in `filename` and return it, or,
+    without filename, return a new `SharedMemory` block, to be closed and unlinked by the caller.
+    """
+    extensions = [abox.universe if k == 0 else abox.extensions.get(k, 0) for k in range(len(hierarchy))]
+    roles = []
+    for r in properties:
+        index = abox.role(r)
+        index.compress()
+        roles.append((r.name, index.indptr, index.indices))
+    data = build([klass.name for klass in hierarchy.classes], hierarchy.ancestors,
+        [individual.name for individual in abox.individuals], extensions, roles)
+    if filename is None:
+        shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        shm.buf[:len(data)] = data
+        return shm
+    tmp = f'{filename}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as fo:
+            fo.write(data)
+        os.replace(tmp, filename)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return filename
+
+
+class Snapshot:
+    """Read-only view of a snapshot
+
+    buffer: the bytes of the snapshot, not copied
+    """
+
+    def __init__(self, buffer, owner=None):
+        self.buffer = memoryview(buffer)
+        # the mmap or the shared memory holding the buffer
+        self.owner = owner
+        magic, version, self.n_classes, self.n_individuals, self.n_roles = HEADER.unpack_from(self.buffer)
+        if (magic, version) != (MAGIC, FORMAT):
+            raise ValueError('not a snapshot, or of another format')
+        table = TABLE.unpack_from(self.buffer, HEADER.size)
+        self.sections = {}
+        for name, offset, length in zip(SECTIONS, table[::2], table[1::2]):
+            view = self.buffer[offset:offset+length]
+            self.sections[name] = view.cast(ARRAYS[name]) if name in ARRAYS else view
+        self.class_row = row_size(self.n_classes)
+        self.individual_row = row_size(self.n_individuals)
+
+    @classmethod
+    def open(cls, filename):
+        with open(filename, 'rb') as fo:
+            buffer = mmap.mmap(fo.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, buffer)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to a shared memory block
+
+        The block is tracked by the resource tracker of the exporting process,
+        so the workers must be started by it, e.g. by a `multiprocessing.Pool`;
+        other processes open a snapshot file.
+        """
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm.buf, shm)
+
+    def close(self):
+        # the views must be released before the buffer
+        for view in self.sections.values():
+            view.release()
+        self.sections = {}
+        self.buffer.release()
+        if self.owner is not None:
+            self.owner.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # names
+
+    def _name(self, kind, k):
+        offsets = self.sections[f'{kind}_offsets']
+        return bytes(self.sections[f'{kind}_names'][offsets[k]:offsets[k+1]]).decode()
+
+    def _id(self, kind, name):
+        # binary search in the ids sorted by name
+        key = name.encode()
+        names, offsets, order = (self.sections[f'{kind}_{s}'] for s in ('names', 'offsets', 'order'))
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = order[mid]
+            if bytes(names[offsets[k]:offsets[k+1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order):
+            k = order[lo]
+            if bytes(names[offsets[k]:offsets[k+1]]) == key:
+                return k
+        raise KeyError(f'unknown {kind} {name!r}')
+
+    def class_id(self, name):
+        return self._id('class', name)
+
+    def individual_id(self, name):
+        return self._id('individual', name)
+
+    def role_id(self, name):
+        return self._id('role', name)
+
+    def class_name(self, k):
+        return self._name('class', k)
+
+    def individual_name(self, k):
+        return self._name('individual', k)
+
+    # queries
+
+    def _bit(self, section, row, k, j):
+        return self.sections[section][k * row + (j >> 3)] >> (j & 7) & 1 == 1
+
+    def fillers(self, k, r):
+        # ids of the fillers of the individual k for the role r (id)
+        indptr = self.sections['role_indptr']
+        base, start = r * (self.n_individuals + 1), self.sections['role_start'][r]
+        return self.sections['role_indices'][start+indptr[base+k]:start+indptr[base+k+1]]
+
+    def is_a(self, A, B):
+        # A <= B, for named classes
+        return self._bit('ancestors', self.class_row, self.class_id(A), self.class_id(B))
+
+    def is_instance_of(self, i, c):
+        return self.member(self.individual_id(i), c)
+
+    def member(self, k, c):
+        """is the individual k an instance of c"""
+        if isinstance(c, str):
+            return self._bit('extensions', self.individual_row, self.class_id(c), k)
+        op, *args = c
+        if op == 'and':
+            return all(self.member(k, cc) for cc in args)
+        elif op == 'or':
+            return any(self.member(k, cc) for cc in args)
+        elif op == 'not':
+            return not self.member(k, args[0])
+        elif op == 'one_of':
+            return any(self.individual_id(i) == k for i in args)
+        elif op in {'min', 'max', 'exactly'}:
+            cardinality, r, cc = args
+        else:
+            r, cc = args
+        row = self.fillers(k, self.role_id(r))
+        if op == 'value':
+            return self.individual_id(cc) in row
+        n = sum(self.member(o, cc) for o in row)
+        if op == 'some':
+            return n >= 1
+        elif op == 'only':
+            # as `abox.satisfies`
+            return len(row) > 0 and n == len(row)
+        elif op == 'min':
+            return n >= cardinality
+        elif op == 'max':
+            return n <= cardinality
+        elif op == 'exactly':
+            return n == cardinality
+        raise ValueError(f'unknown operator {op!r}')
+
+    def extension(self, c):
+        """Bitset of the instances of a concept, as `ABoxIndex.extension`"""
+        if isinstance(c, str):
+            k = self.class_id(c)
+            row = self.sections['extensions'][k*self.individual_row:(k+1)*self.individual_row]
+            return int.from_bytes(row, 'little')
+        op, *args = c
+        universe = (1 << self.n_individuals) - 1
+        if op == 'and':
+            bits = universe
+            for cc in args:
+                bits &= self.extension(cc)
+            return bits
+        elif op == 'or':
+            bits = 0
+            for cc in args:
+                bits |= self.extension(cc)
+            return bits
+        elif op == 'not':
+            return universe & ~self.extension(args[0])
+        # restrictions and nominals, one individual at a time
+        return bitset(k for k in range(self.n_individuals) if self.member(k, c))
+
+    def members(self, c):
+        return [self.individual_name(k) for k in iter_bits(self.extension(c))]
@@ -2,31 +2,172 @@
 # -*- coding: utf-8 -*-
 
 
+import functools
+from collections import OrderedDict
+
 from owlready2 import *
+from hierarchy import HierarchyIndex
+from planner import order
+
+
+class LRUCache:
+    """Bounded cache with LRU eviction
+
+    hits, misses: counters of lookups
+    """
+    def __init__(self, maxsize=1<<16):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        self.data.clear()
+
+    def invalidate(self, predicate):
+        # drop the entries whose key satisfies the predicate, return their number
+        keys = [key for key in self.data if predicate(key)]
+        for key in keys:
+            del self.data[key]
+        return len(keys)
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.data), 'maxsize': self.maxsize}
+
+
+class NominalIndex:
+    """The members of nominals (`OneOf`), as frozensets built once per nominal
+
+    Owlready hashes and compares a nominal by building the set of its members,
+    so the nominals are keyed by id, and kept by the index to keep their id.
+    A copy of the members is kept too: a nominal whose members changed is indexed again.
+    """
+    def __init__(self, maxsize=1<<12):
+        self.cache = LRUCache(maxsize)
+
+    def members(self, c):
+        entry = self.cache.get(id(c))
+        # comparing the lists is a scan of identities, without hashing
+        if entry is None or entry[0] is not c or entry[1] != c.instances:
+            entry = self.cache[id(c)] = c, list(c.instances), frozenset(c.instances)
+        return entry[2]
+
+    def clear(self):
+        self.cache.clear()
+
+    def info(self):
+        return self.cache.info()
+
+
+# the hierarchy of named classes, grows as classes are met or declared
+hierarchy_index = HierarchyIndex()
+# the members of nominals
+nominal_index = NominalIndex()
+
+subsumption_cache = LRUCache()
+membership_cache = LRUCache()
+
+_missing = object()
+
+def memoize(cache, uncached=()):
+    """memoize a binary relation `f(x, c, ...)` in `cache`, keyed by `(x, c)`
+
+    unhashable arguments, and `x` or `c` of the types `uncached`, are not cached
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(x, c, *args, **kwargs):
+            if isinstance(x, uncached) or isinstance(c, uncached):
+                return f(x, c, *args, **kwargs)
+            key = x, c
+            try:
+                hash(key)
+            except TypeError:
+                return f(x, c, *args, **kwargs)
+            value = cache.get(key, _missing)
+            if value is _missing:
+                value = cache[key] = f(x, c, *args, **kwargs)
+            return value
+        wrapper.cache = cache
+        return wrapper
+    return decorator
 
+
+def clear_caches():
+    # the caches do not watch Owlready: after changing the ontology directly,
+    # e.g. `a.is_a.append(B)`, call it or `declared` of the calculator
+    subsumption_cache.clear()
+    membership_cache.clear()
+    nominal_index.clear()
+
+
+def cache_info():
+    return {'is_a': subsumption_cache.info(), 'is_instance_of': membership_cache.info(),
+    'nominals': nominal_index.info()}
+
+
+def fillers(i, r):
+    # the values of the property r for i, as a list
+    i_r = getattr(i, r.name)
+    if isinstance(i_r, list):
+        return i_r
+    # functional property
+    return [] if i_r is None else [i_r]
+
+
+# a hashed nominal is checked faster than its key in the cache
+@memoize(membership_cache, uncached=OneOf)
 def is_instance_of(i, c, exclude=set()):
     # i: Thing, c: Concept/Class
     if i.INDIRECT_is_instance_of and c in i.INDIRECT_is_instance_of:
         return True
+    if isinstance(c, OneOf):
+        return i in nominal_index.members(c)
     if isinstance(c, And):
-        return all(is_instance_of(i, cc, exclude) for cc in c.Classes)
+        return all(is_instance_of(i, cc, exclude) for cc in order(c.Classes))
     elif isinstance(c, Or):
-        return any(is_instance_of(i, cc, exclude) for cc in c.Classes)
+        return any(is_instance_of(i, cc, exclude) for cc in order(c.Classes, conjunctive=False))
     elif isinstance(c, Not):
-        return not is_instance_of(i, c, exclude)
-    elif isinstance(c, OneOf):
-        return any(i == x for x in c.instances)
+        return not is_instance_of(i, c.Class, exclude)
     elif isinstance(c, Restriction):
-        i_r = getattr(i, c.property.name)
-        if i_r:
-            if c.type == 24:
-                return is_a(c.value, i_r)
-            if c.type == 25:
-                return is_a(i_r, c.value)
-            elif c.type == 29:
-                return c.value == i_r[0]
-        else:
-            return False
+        i_r = fillers(i, c.property)
+        if c.type == VALUE:
+            return c.value in i_r
+        elif c.type in {MIN, MAX, EXACTLY}:
+            n = sum(1 for x in i_r if is_instance_of(x, c.value))
+            if c.type == MIN:
+                return n >= c.cardinality
+            elif c.type == MAX:
+                return n <= c.cardinality
+            else:
+                return n == c.cardinality
+        elif i_r:
+            if c.type == SOME:
+                return any(is_instance_of(x, c.value) for x in i_r)
+            elif c.type == ONLY:
+                return all(is_instance_of(x, c.value) for x in i_r)
+        return False
     else:
         if i.INDIRECT_is_instance_of:
             if c in i.INDIRECT_is_instance_of:
@@ -49,9 +190,15 @@ def not_instance_of(x, c, exclude=set()):
     return is_instance_of(x, c, exclude)
 
 
+@memoize(subsumption_cache, uncached=OneOf)
 def is_a(x, c, exclude=set()):
     if x == c or c == Thing:
         return True
+    elif isinstance(x, ThingClass) and isinstance(c, ThingClass):
+        if hierarchy_index.is_current(x):
+            return hierarchy_index.is_subclass(x, c)
+        # changed outside `declared`, e.g. by a reasoner
+        return c in x.INDIRECT_is_a
     elif hasattr(x, 'is_a') and c in x.is_a:
         return True
     elif hasattr(x, 'INDIRECT_is_a'):
@@ -66,13 +213,15 @@ def is_a(x, c, exclude=set()):
         #                 return True
 
     if isinstance(c, And):
-        return all(is_a(x, cc) for cc in c.Classes)
+        return all(is_a(x, cc) for cc in order(c.Classes))
     elif isinstance(c, (IndividualValueList, list)):
         return x in c
     if isinstance(x, Or):
         return all(is_a(cc, c) for cc in x.Classes)
     elif isinstance(x, OneOf):
-        return all(is_instance_of(xi, c) for xi in x.instances)
+        if isinstance(c, OneOf):
+            return nominal_index.members(x) <= nominal_index.members(c)
+        return all(is_instance_of(xi, c) for xi in nominal_index.members(x))
     elif isinstance(x, And):
         return any(is_a(xi, c) for xi in x.Classes)
     else:
@@ -91,32 +240,54 @@ def not_a(x, c, exclude=set()):
     return is_a(x, c, exclude)
 
 
+def _split(As):
+    # drop the duplicates, separate named classes from other concepts
+    As = list(dict.fromkeys(As))
+    return As, [A for A in As if isinstance(A, ThingClass)], [A for A in As if not isinstance(A, ThingClass)]
+
+
 def inf(As, C=None):
     # inf elements of As
+    # named classes are compared all at once with their ancestor bitsets
     if C:
         As = [A for A in As if not is_a(C, A)]
-        return inf(As)
-    else:
-        As = list(As)
-        for _ in range(len(As)):
-            A = As.pop(0)
-            if not any(is_a(B, A) for B in As if hasattr(B,'is_a') and hasattr(B, 'INDIRECT_is_a')):
-                As.append(A)
-    return As
+    As, named, _ = _split(As)
+    if not all(hierarchy_index.is_current(B) for B in named):
+        return [A for A in As if not any(B is not A and is_a(B, A) for B in named)]
+    below = 0
+    for B in named:
+        below |= hierarchy_index.ancestor_bits(B) & ~hierarchy_index.bit(B)
+
+    def is_inf(A):
+        if isinstance(A, ThingClass):
+            return not below & hierarchy_index.bit(A)
+        else:
+            return not any(is_a(B, A) for B in named)
+
+    return [A for A in As if is_inf(A)]
 
 
 def sup(As, C=None):
     # sup elements of As not containing C
+    # named classes are compared all at once with their ancestor bitsets
     if C:
         As = [A for A in As if not is_a(C, A)]
-        return sup(As)
-    else:
-        As = list(As)
-        for _ in range(len(As)):
-            A = As.pop(0)
-            if not any(is_a(A, B) for B in As):
-                As.append(A)
-    return As
+    As, named, others = _split(As)
+    if not all(hierarchy_index.is_current(B) for B in named):
+        return [A for A in As if not any(B is not A and is_a(A, B) for B in As)]
+    above = 0
+    for B in named:
+        above |= hierarchy_index.bit(B)
+
+    def is_sup(A):
+        if any(is_a(A, B) for B in others if B is not A):
+            return False
+        if isinstance(A, ThingClass):
+            return not hierarchy_index.ancestor_bits(A) & ~hierarchy_index.bit(A) & above
+        else:
+            return not any(is_a(A, B) for B in named)
+
+    return [A for A in As if is_sup(A)]
 
 
 def pretty(x):
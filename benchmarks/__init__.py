@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of `already`
+
+Run them from the root of the repository, e.g.
+    python -m benchmarks.suite --out results.json
+    python -m benchmarks.suite --compare results.json
+
+The modules of `already` are imported as scripts, as in the package itself.
+"""
+
+import pathlib
+import sys
+
+PACKAGE = pathlib.Path(__file__).resolve().parent.parent / 'already'
+
+if str(PACKAGE) not in sys.path:
+    sys.path.insert(0, str(PACKAGE))
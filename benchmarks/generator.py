@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Synthetic DL scripts
+
+An ontology is described by
+- depth, width: `depth` levels of `width` classes, every class under a random class of the level above,
+- individuals: the size of the ABox, every individual in a random class,
+- roles: the names of the object properties used in restrictions, none for concepts without restrictions,
+- nesting: the depth of the random concept expressions in the queries.
+
+The scripts are written in the syntax of `already`:
+    ! C0_1 :: Thing; ! i3 : C2_1; i3 : C1_0 & some r0. (C0_1 | ~C1_1)
+"""
+
+import random
+
+
+class Ontology:
+    """Synthetic ontology, the names of its classes and individuals
+
+    classes: list of levels of class names, the first level under Thing
+    parents: class name -> name of its parent
+    types: individual name -> class name
+    """
+
+    def __init__(self, depth=4, width=10, individuals=1000, roles=('r0', 'r1'), seed=0):
+        self.rng = random.Random(seed)
+        self.roles = list(roles)
+        self.classes = [[f'C{d}_{k}' for k in range(width)] for d in range(depth)]
+        self.parents = {}
+        for d, level in enumerate(self.classes):
+            for name in level:
+                self.parents[name] = 'Thing' if d == 0 else self.rng.choice(self.classes[d-1])
+        self.types = {f'i{k}': self.rng.choice(self.all_classes) for k in range(individuals)}
+
+    @property
+    def all_classes(self):
+        return [name for level in self.classes for name in level]
+
+    def iter_declarations(self):
+        # the parents are declared before their children
+        for level in self.classes:
+            for name in level:
+                yield f'! {name} :: {self.parents[name]}'
+        for name, klass in self.types.items():
+            yield f'! {name} : {klass}'
+
+    def declarations(self):
+        return ';\n'.join(self.iter_declarations())
+
+    def concept(self, nesting):
+        """random concept expression of depth `nesting`"""
+        if nesting <= 0:
+            return self.rng.choice(self.all_classes)
+        op = self.rng.choice(['&', '|', '~', 'some', 'only'] if self.roles else ['&', '|', '~'])
+        if op in {'&', '|'}:
+            return f'({self.concept(nesting-1)}) {op} ({self.concept(nesting-1)})'
+        elif op == '~':
+            return f'~({self.concept(nesting-1)})'
+        else:
+            return f'{op} {self.rng.choice(self.roles)}. ({self.concept(nesting-1)})'
+
+    def iter_queries(self, n, nesting=2):
+        individuals = list(self.types)
+        classes = self.all_classes
+        for k in range(n):
+            if k % 2:
+                yield f'{self.rng.choice(classes)} <= {self.rng.choice(classes)}'
+            else:
+                yield f'{self.rng.choice(individuals)} : {self.concept(nesting)}'
+
+    def queries(self, n, nesting=2):
+        return ';\n'.join(self.iter_queries(n, nesting))
+
+
+def generate(depth=4, width=10, individuals=1000, queries=100, nesting=2, seed=0):
+    """A synthetic script, the declarations followed by the queries"""
+    ontology = Ontology(depth, width, individuals, seed=seed)
+    return ontology.declarations() + ';\n' + ontology.queries(queries, nesting)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Interactive session: declarations mixed with queries
+
+After each declaration of an individual or of a superclass, a batch of
+`is_a`/`is_instance_of` queries is answered. The derived state is either
+maintained incrementally (`OwlreadyCalculator.declared`),
+or cleared as before.
+
+usage: python -m benchmarks.incremental [--steps N --queries Q]
+"""
+
+import argparse
+import json
+import random
+import time
+import types
+
+from calculators import *
+
+
+def session(mode, steps, queries, seed=0):
+    rng = random.Random(seed)
+    onto = get_ontology(f'http://already.org/bench/incremental/{mode}.owl')
+    calc = OwlreadyCalculator()
+    clear_caches()
+    with onto:
+        r = types.new_class('r', (ObjectProperty,))
+        classes = [Thing]
+        for k in range(300):
+            classes.append(types.new_class(f'C{k}', (rng.choice(classes),)))
+        classes = classes[1:]
+        individuals = [rng.choice(classes)(f'i{k}') for k in range(1000)]
+        for i in individuals:
+            i.r = [rng.choice(individuals) for _ in range(2)]
+    concepts = [And([rng.choice(classes), Not(rng.choice(classes))]) for _ in range(20)] \
+        + [r.some(rng.choice(classes)) for _ in range(20)] + classes[:20]
+    members = [(rng.choice(individuals), rng.choice(concepts)) for _ in range(queries)]
+    pairs = [(rng.choice(classes), rng.choice(concepts)) for _ in range(queries)]
+
+    t = time.perf_counter()
+    with onto:
+        for step in range(steps):
+            if step % 4:
+                x = rng.choice(classes)(f'n{step}')
+            else:
+                x = rng.choice(classes)
+                # not x or one of its subclasses, that would make a cycle
+                bases = [c for c in classes[:10] if c not in x.descendants()]
+                if bases:
+                    x.is_a.append(rng.choice(bases))
+            if mode == 'clear':
+                clear_caches()
+            calc.declared(x)
+            for i, c in members:
+                is_instance_of(i, c)
+            for A, c in pairs:
+                is_a(A, c)
+    return time.perf_counter() - t
+
+
+def main(steps=200, queries=2000):
+    results = {mode: session(mode, steps, queries) for mode in ('clear', 'incremental')}
+    results['speedup'] = results['clear'] / results['incremental']
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'incremental', 'steps': args.steps, 'queries': args.queries,
+        'results': main(args.steps, args.queries)}, indent=2))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""`utils.inf`/`utils.sup` against the former pairwise implementation
+
+A random tree of classes is built, then both implementations compute
+the inf and sup elements of random samples of classes.
+The caches of `is_a` are cleared before each run.
+
+usage: python -m benchmarks.infsup [--classes N] [--sizes 10 100 ...]
+"""
+
+import argparse
+import json
+import random
+import time
+import types
+
+from utils import *
+
+
+def pairwise_inf(As):
+    # the former implementation
+    As = list(As)
+    for _ in range(len(As)):
+        A = As.pop(0)
+        if not any(is_a(B, A) for B in As if hasattr(B,'is_a') and hasattr(B, 'INDIRECT_is_a')):
+            As.append(A)
+    return As
+
+
+def pairwise_sup(As):
+    # the former implementation
+    As = list(As)
+    for _ in range(len(As)):
+        A = As.pop(0)
+        if not any(is_a(A, B) for B in As):
+            As.append(A)
+    return As
+
+
+def random_tree(onto, n, seed=0):
+    rng = random.Random(seed)
+    classes = [Thing]
+    with onto:
+        for k in range(n):
+            classes.append(types.new_class(f'C{k}', (rng.choice(classes),)))
+    return classes[1:]
+
+
+def timeit(f, As, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        clear_caches()
+        t = time.perf_counter()
+        result = f(As)
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+
+def main(n_classes=2000, sizes=(10, 50, 200, 500), repeat=3, seed=0):
+    onto = get_ontology('http://already.org/bench/infsup.owl')
+    classes = random_tree(onto, n_classes, seed)
+    rng = random.Random(seed)
+    results = []
+    for size in sizes:
+        As = rng.sample(classes, size)
+        for name, new, old in (('inf', inf, pairwise_inf), ('sup', sup, pairwise_sup)):
+            t_new, r_new = timeit(new, As, repeat)
+            t_old, r_old = timeit(old, As, repeat)
+            assert set(r_new) == set(r_old), f'{name} differs from the pairwise implementation'
+            results.append({'function': name, 'size': size, 'bitset': t_new, 'pairwise': t_old,
+                'speedup': t_old / t_new if t_new else None})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--classes', type=int, default=2000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200, 500])
+    parser.add_argument('-n', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'infsup', 'classes': args.classes,
+        'results': main(args.classes, args.sizes, args.repeat)}, indent=2))
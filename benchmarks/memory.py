@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Memory of parsed trees: actions against lean nodes
+
+A synthetic script is parsed by `DL()` and by `DL(lean=True)`;
+the memory still allocated after the parse (retained), and the peak, are measured by tracemalloc.
+
+usage: python -m benchmarks.memory [--individuals N --queries Q]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from . import generator
+
+from language import DL, pp
+
+
+def measure(source, lean):
+    pp.ParserElement.resetCache()
+    gc.collect()
+    tracemalloc.start()
+    tree = DL(lean=lean).parse(source)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pp.ParserElement.resetCache()
+    return {'statements': len(tree.tokens), 'retained': retained, 'peak': peak}
+
+
+def main(individuals=2000, queries=500):
+    ontology = generator.Ontology(depth=3, width=20, individuals=individuals)
+    source = ontology.declarations() + ';\n' + ontology.queries(queries)
+    # the grammar is built before measuring
+    DL().make_parser()
+    results = {'actions': measure(source, False), 'lean': measure(source, True)}
+    results['ratio'] = results['actions']['retained'] / results['lean']['retained']
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--individuals', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'memory', 'results': main(args.individuals, args.queries)}, indent=2))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Membership and subsumption of large nominals `{a, b, ...}`
+
+A nominal of N individuals is checked by `is_instance_of` and `is_a`,
+with the hashed index of `utils.nominal_index`, against a linear scan of its members.
+
+usage: python -m benchmarks.nominals [--individuals N --checks K]
+"""
+
+import argparse
+import json
+import time
+
+from owlready2 import *
+
+from utils import is_a, is_instance_of, clear_caches
+
+
+def main(individuals=20000, checks=1000):
+    onto = get_ontology('http://already.org/benchmarks/nominals.owl')
+    with onto:
+        class Member(Thing): pass
+        members = [Member(f'm{k}') for k in range(individuals)]
+        nominal = OneOf(members)
+        part = OneOf(members[::7])
+    probes = members[::max(1, individuals // checks)][:checks]
+    clear_caches()
+
+    t = time.perf_counter()
+    linear = [any(i == x for x in nominal.instances) for i in probes]
+    linear_time = time.perf_counter() - t
+    t = time.perf_counter()
+    hashed = [is_instance_of(i, nominal) for i in probes]
+    hashed_time = time.perf_counter() - t
+    assert linear == hashed
+
+    t = time.perf_counter()
+    linear_subset = all(any(i == x for x in nominal.instances) for i in part.instances)
+    subset_linear_time = time.perf_counter() - t
+    t = time.perf_counter()
+    assert is_a(part, nominal) and linear_subset
+    subset_time = time.perf_counter() - t
+    onto.destroy()
+    return {'individuals': individuals, 'checks': len(probes),
+        'is_instance_of': {'linear': linear_time, 'hashed': hashed_time, 'speedup': linear_time / hashed_time},
+        'is_a': {'members': len(part.instances), 'linear': subset_linear_time, 'hashed': subset_time,
+        'speedup': subset_linear_time / subset_time}}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--individuals', type=int, default=20000)
+    parser.add_argument('--checks', type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'nominals', 'results': main(args.individuals, args.checks)}, indent=2))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Scaling of `BaseLanguage.parallelParse` with the number of processes
+
+A synthetic script of declarations and formulas is parsed
+sequentially, then with 1, 2, 4, ... processes up to the number of cores.
+
+usage: python -m benchmarks.parallel [--statements N]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from . import generator
+
+from language import DL
+
+
+def main(n=20000, chunk_statements=1000):
+    ontology = generator.Ontology(depth=4, width=n // 40, individuals=n // 2)
+    source = ontology.declarations() + ';\n' + ontology.queries(n - len(ontology.parents) - n // 2)
+    dl = DL()
+    dl.make_parser()
+    t = time.perf_counter()
+    expected = dl.parse(source)
+    sequential = time.perf_counter() - t
+    results = []
+    processes = 1
+    while processes <= os.cpu_count():
+        t = time.perf_counter()
+        parsed = dl.parallelParse(source, processes=processes, chunk_statements=chunk_statements)
+        elapsed = time.perf_counter() - t
+        assert len(parsed.tokens) == len(expected.tokens)
+        results.append({'processes': processes, 'seconds': elapsed, 'speedup': sequential / elapsed})
+        processes *= 2
+    return {'statements': n, 'sequential': sequential, 'parallel': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--statements', type=int, default=20000)
+    parser.add_argument('--chunk', type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'parallel', **main(args.statements, args.chunk)}, indent=2))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Warm start: replaying the scripts against restoring a saved calculator
+
+A fresh process replays a synthetic script (parse, eval, materialize),
+answers queries and saves the calculator with `persistence.save`;
+another fresh process restores it with `persistence.restore` and answers the same queries.
+
+usage: python -m benchmarks.persistence [--individuals N --depth D --width W]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from . import generator
+
+
+def replay(filename, depth, width, individuals, queries):
+    from calculators import OwlreadyCalculator, get_ontology, ObjectProperty, Thing, types
+    from language import DL
+    import persistence
+    ontology = generator.Ontology(depth, width, individuals)
+    t = time.perf_counter()
+    dl = DL()
+    calc = OwlreadyCalculator()
+    calc.set_constant('Thing', Thing)
+    onto = get_ontology('http://already.org/benchmarks/persistence.owl')
+    with onto:
+        for name in ontology.roles:
+            calc.set_constant(name, types.new_class(name, (ObjectProperty,)))
+        dl.parse(ontology.declarations()).eval(calc)
+    calc.materialize(onto)
+    seconds = time.perf_counter() - t
+    answers = [dl.parse(query).eval(calc) for query in queries]
+    t = time.perf_counter()
+    persistence.save(calc, filename)
+    return {'seconds': seconds, 'save seconds': time.perf_counter() - t}, answers
+
+
+def restore(filename, queries):
+    import persistence
+    from language import DL
+    t = time.perf_counter()
+    calc = persistence.restore(filename)
+    seconds = time.perf_counter() - t
+    dl = DL()
+    answers = [dl.parse(query).eval(calc) for query in queries]
+    return {'seconds': seconds}, answers
+
+
+def main(depth=4, width=25, individuals=5000, queries=200):
+    ontology = generator.Ontology(depth, width, individuals)
+    # the queries are drawn after the declarations, as the replay draws them
+    queries = list(ontology.iter_queries(queries, nesting=2))
+    # every process starts with an empty Owlready world
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'kb.sqlite3')
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            replayed, expected = pool.apply(replay, (filename, depth, width, individuals, queries))
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            restored, answers = pool.apply(restore, (filename, queries))
+        size = os.path.getsize(filename)
+    assert answers == expected
+    return {'statements': len(ontology.parents) + individuals, 'replay': replayed, 'restore': restored,
+        'file bytes': size, 'speedup': replayed['seconds'] / restored['seconds']}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--width', type=int, default=25)
+    parser.add_argument('--individuals', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'persistence', 'results': main(args.depth, args.width, args.individuals, args.queries)}, indent=2))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Parsing backends: the pyparsing grammar against the hand-written parser of `pratt`
+
+A synthetic script is parsed by `DL(backend='pyparsing')` (with packrat) and `DL(backend='pratt')`;
+the trees are compared statement by statement with `pratt.differences`, which fails the benchmark.
+
+usage: python -m benchmarks.pratt [--individuals N --queries Q --nesting K]
+"""
+
+import argparse
+import json
+import time
+
+from . import generator
+
+import pratt
+from language import DL, make_grammar, pp
+
+
+def parse_time(dl, source, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        pp.ParserElement.resetCache()
+        t = time.perf_counter()
+        tree = dl.parse(source)
+        best = min(best, time.perf_counter() - t)
+    return best, len(tree.tokens)
+
+
+def main(individuals=1000, queries=1000, nesting=3, repeat=3):
+    ontology = generator.Ontology(depth=3, width=10, individuals=individuals)
+    statements = list(ontology.iter_declarations()) + list(ontology.iter_queries(queries, nesting))
+    source = ';\n'.join(statements)
+    grammar = make_grammar().statement_sequence
+    differences = [d for statement in statements for d in pratt.differences(statement, grammar)]
+    if differences:
+        raise AssertionError('\n'.join(differences[:10]))
+    results = {}
+    for backend in ('pyparsing', 'pratt'):
+        dl = DL(backend=backend)
+        dl.make_parser()
+        seconds, n = parse_time(dl, source, repeat)
+        results[backend] = {'seconds': seconds, 'statements': n, 'statements/s': n / seconds}
+    results['speedup'] = results['pyparsing']['seconds'] / results['pratt']['seconds']
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--individuals', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--nesting', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'pratt', 'results': main(args.individuals, args.queries, args.nesting, args.repeat)}, indent=2))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Load test of `server.Server` on a synthetic ontology
+
+A server is started in this process, on a Unix socket,
+then pipelined clients send it random questions.
+
+usage: python -m benchmarks.server_load [--connections C] [--requests N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+
+from . import generator
+
+from calculators import *
+from language import DL
+from server import Server, load_test
+
+
+async def main(connections=4, requests=2000, individuals=1000, seed=0):
+    ontology = generator.Ontology(individuals=individuals, roles=(), seed=seed)
+    calculator = OwlreadyCalculator()
+    calculator.set_constant('Thing', Thing)
+    onto = get_ontology(f'http://already.org/bench/server{seed}.owl')
+    with onto:
+        DL().parse(ontology.declarations()).eval(calculator)
+    questions = list(ontology.iter_queries(200, nesting=1))
+
+    path = os.path.join(tempfile.mkdtemp(), 'already.sock')
+    server = asyncio.create_task(Server(calculator, onto).serve(path=path))
+    while not os.path.exists(path):
+        await asyncio.sleep(0.01)
+    try:
+        return await load_test(questions, connections, requests, path=path)
+    finally:
+        server.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--individuals', type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'server_load',
+        **asyncio.run(main(args.connections, args.requests, args.individuals))}, indent=2))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Worker processes answering membership queries over the same ontology
+
+Every worker either loads the ontology and materializes its ABox (rebuild),
+or attaches to the shared-memory snapshot exported once by `OwlreadyCalculator.export_snapshot`.
+The answers of both are checked against the calculator of the parent.
+
+usage: python -m benchmarks.snapshot [--individuals N --queries Q --processes P]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import types
+
+from calculators import *
+import snapshot
+
+
+def owl_concept(onto, c):
+    # the Owlready concept of a concept of `snapshot`
+    if isinstance(c, str):
+        return onto[c]
+    op, *args = c
+    if op == 'and':
+        return And([owl_concept(onto, cc) for cc in args])
+    elif op == 'not':
+        return Not(owl_concept(onto, args[0]))
+    r, cc = args
+    return getattr(onto[r], op)(owl_concept(onto, cc))
+
+
+def rebuild(filename, queries):
+    t = time.perf_counter()
+    world = World()
+    onto = world.get_ontology(f'file://{filename}').load()
+    calc = OwlreadyCalculator()
+    abox = calc.materialize(onto)
+    answers = [abox.contains(onto[i], owl_concept(onto, c)) for i, c in queries]
+    return time.perf_counter() - t, answers
+
+
+def attach(name, queries):
+    t = time.perf_counter()
+    with snapshot.Snapshot.attach(name) as snap:
+        answers = [snap.is_instance_of(i, c) for i, c in queries]
+    return time.perf_counter() - t, answers
+
+
+def main(individuals=5000, queries=2000, processes=4, seed=0):
+    rng = random.Random(seed)
+    onto = get_ontology('http://already.org/benchmarks/snapshot.owl')
+    with onto:
+        r = types.new_class('r', (ObjectProperty,))
+        classes = [Thing]
+        for k in range(200):
+            classes.append(types.new_class(f'C{k}', (rng.choice(classes),)))
+        names = [klass.name for klass in classes[1:]]
+        members = [onto[rng.choice(names)](f'i{k}') for k in range(individuals)]
+        for i in members:
+            i.r = [rng.choice(members) for _ in range(2)]
+    concepts = [('and', rng.choice(names), ('not', rng.choice(names))) for _ in range(20)] \
+        + [('some', 'r', rng.choice(names)) for _ in range(20)] + names[:20]
+    work = [(rng.choice(members).name, rng.choice(concepts)) for _ in range(queries)]
+    chunks = [work[k::processes] for k in range(processes)]
+
+    calc = OwlreadyCalculator()
+    abox = calc.materialize(onto)
+    expected = [abox.contains(onto[i], owl_concept(onto, c)) for i, c in work]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'snapshot.owl')
+        onto.save(filename)
+        t = time.perf_counter()
+        shm = calc.export_snapshot()
+        export = time.perf_counter() - t
+        try:
+            with multiprocessing.Pool(processes) as pool:
+                for mode, f, arg in (('rebuild', rebuild, filename), ('snapshot', attach, shm.name)):
+                    t = time.perf_counter()
+                    parts = pool.starmap(f, [(arg, chunk) for chunk in chunks])
+                    wall = time.perf_counter() - t
+                    answers = [None] * len(work)
+                    for k, (_, part) in enumerate(parts):
+                        answers[k::processes] = part
+                    assert answers == expected, mode
+                    results[mode] = {'seconds': wall, 'worker seconds': max(s for s, _ in parts)}
+        finally:
+            shm.close()
+            shm.unlink()
+    results['export seconds'] = export
+    results['snapshot bytes'] = shm.size
+    results['speedup'] = results['rebuild']['seconds'] / results['snapshot']['seconds']
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--individuals', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'snapshot', 'results': main(args.individuals, args.queries, args.processes)}, indent=2))
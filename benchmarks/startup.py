@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Cold-start time of `already`
+
+Each sample runs in a fresh interpreter, so that nothing is cached:
+- import: `import language`
+- make_parser: the first `DL().make_parser()`, i.e. building the grammar
+- first_parse: the first parse of a small script
+
+The results are printed as one JSON object, to be tracked between releases.
+
+usage: python -m benchmarks.startup [-n REPEAT]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from . import PACKAGE
+
+PROBE = """
+import time
+t0 = time.perf_counter()
+import language
+t1 = time.perf_counter()
+dl = language.DL()
+dl.make_parser()
+t2 = time.perf_counter()
+dl.parse('! I :: Thing; ! J :: I; ! i : J; i : I & J')
+t3 = time.perf_counter()
+print(t1 - t0, t2 - t1, t3 - t2)
+"""
+
+
+def sample():
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=PACKAGE,
+        check=True, capture_output=True, text=True).stdout
+    return map(float, out.split())
+
+
+def main(repeat=5):
+    samples = {'import': [], 'make_parser': [], 'first_parse': []}
+    for _ in range(repeat):
+        for key, t in zip(samples, sample()):
+            samples[key].append(t)
+    return {key: {'min': min(ts), 'median': statistics.median(ts)} for key, ts in samples.items()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps({'benchmark': 'startup', 'python': sys.version.split()[0], 'results': main(args.repeat)}, indent=2))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark suite on a synthetic ontology
+
+Times, on an ontology made by `generator.Ontology`:
+- parse: parsing the declarations and the queries
+- eval: evaluating the declarations, then the queries
+- is_a, is_instance_of: random named pairs and random concept expressions
+- inf, sup: random samples of classes
+- lookup: `calculator[name]` for random names
+
+The caches of `utils` are cleared before each repetition.
+The results are written as JSON; with `--compare`, the timings are checked
+against former results and the command fails on a regression.
+
+usage: python -m benchmarks.suite [--depth D --width W --individuals N --nesting K] [--out FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from . import generator
+
+from language import DL
+from calculators import *
+
+
+def measure(f, repeat=3, setup=clear_caches):
+    # min and median time of f(), and its last value
+    times = []
+    for _ in range(repeat):
+        setup()
+        t = time.perf_counter()
+        value = f()
+        times.append(time.perf_counter() - t)
+    return {'min': min(times), 'median': statistics.median(times)}, value
+
+
+def run(depth=4, width=10, individuals=1000, queries=200, nesting=2, fillers=2, samples=1000, repeat=3, seed=0):
+    ontology = generator.Ontology(depth, width, individuals, seed=seed)
+    rng = ontology.rng
+    declarations = ontology.declarations()
+    query_source = ontology.queries(queries, nesting)
+
+    dl = DL()
+    dl.make_parser()
+    results = {}
+    results['parse_declarations'], tbox = measure(lambda: dl.parse(declarations), repeat)
+    results['parse_queries'], query_tree = measure(lambda: dl.parse(query_source), repeat)
+
+    onto = get_ontology(f'http://already.org/bench/{seed}.owl')
+    calc = OwlreadyCalculator()
+    calc.set_constant('Thing', Thing)
+    with onto:
+        t = time.perf_counter()
+        tbox.eval(calc)
+        results['eval_declarations'] = {'min': time.perf_counter() - t}
+        for name in ontology.roles:
+            calc.set_constant(name, types.new_class(name, (ObjectProperty,)))
+    names = list(ontology.types)
+    for name in names:
+        for role in ontology.roles:
+            getattr(calc[name], role).extend(calc[rng.choice(names)] for _ in range(fillers))
+
+    results['eval_queries'], _ = measure(lambda: query_tree.eval(calc), repeat)
+
+    classes = [calc[name] for name in ontology.all_classes]
+    individuals_ = [calc[name] for name in names]
+    pairs = [(rng.choice(classes), rng.choice(classes)) for _ in range(samples)]
+    results['is_a'], _ = measure(lambda: [is_a(A, B) for A, B in pairs], repeat)
+
+    members = [(rng.choice(individuals_), rng.choice(classes)) for _ in range(samples)]
+    results['is_instance_of_named'], _ = measure(lambda: [is_instance_of(i, C) for i, C in members], repeat)
+    expressions = [dl.parse(f'i0 : {ontology.concept(nesting)}').tokens[0].concept.eval(calc) for _ in range(20)]
+    complex_members = [(rng.choice(individuals_), rng.choice(expressions)) for _ in range(samples)]
+    results['is_instance_of_complex'], _ = measure(lambda: [is_instance_of(i, C) for i, C in complex_members], repeat)
+
+    sample = rng.sample(classes, min(len(classes), 100))
+    results['inf'], _ = measure(lambda: inf(sample), repeat)
+    results['sup'], _ = measure(lambda: sup(sample), repeat)
+
+    lookups = [rng.choice(names + ontology.all_classes) for _ in range(samples)]
+    results['lookup'], _ = measure(lambda: [calc[name] for name in lookups], repeat)
+
+    config = {'depth': depth, 'width': width, 'individuals': individuals, 'queries': queries,
+        'nesting': nesting, 'fillers': fillers, 'samples': samples, 'repeat': repeat, 'seed': seed}
+    return {'benchmark': 'suite', 'python': sys.version.split()[0], 'config': config, 'results': results}
+
+
+def compare(new, old, tolerance=1.2):
+    # the timings of `new` more than `tolerance` times slower than `old`
+    regressions = {}
+    for key, timing in new['results'].items():
+        if key in old['results']:
+            ratio = timing['min'] / old['results'][key]['min']
+            if ratio > tolerance:
+                regressions[key] = ratio
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--individuals', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--nesting', type=int, default=2)
+    parser.add_argument('-n', '--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='file to write the results to')
+    parser.add_argument('--compare', help='former results to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=1.2)
+    args = parser.parse_args()
+
+    report = run(args.depth, args.width, args.individuals, args.queries, args.nesting,
+        repeat=args.repeat, seed=args.seed)
+    if args.out:
+        with open(args.out, 'w') as fo:
+            json.dump(report, fo, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        with open(args.compare) as fo:
+            regressions = compare(report, json.load(fo), args.tolerance)
+        for key, ratio in regressions.items():
+            print(f'regression: {key} is {ratio:.2f}x slower', file=sys.stderr)
+        sys.exit(1 if regressions else 0)
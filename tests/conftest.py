@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of `already`
+
+Run them from the root of the repository:
+    python -m pytest tests
+
+The modules of `already` are imported as scripts, as in the package itself.
+The tests that parse DLs need pyparsing_ext, they are skipped without it.
+"""
+
+import itertools
+import pathlib
+import sys
+
+import pytest
+
+PACKAGE = pathlib.Path(__file__).resolve().parent.parent / 'already'
+
+if str(PACKAGE) not in sys.path:
+    sys.path.insert(0, str(PACKAGE))
+
+_ontologies = itertools.count()
+
+
+@pytest.fixture
+def onto():
+    # a new ontology, with empty caches and an empty hierarchy index
+    from owlready2 import get_ontology
+    from utils import clear_caches, hierarchy_index
+    clear_caches()
+    hierarchy_index.__init__()
+    yield get_ontology(f'http://already.org/tests/{next(_ontologies)}.owl')
+    clear_caches()
+
+
+@pytest.fixture
+def dl():
+    pytest.importorskip('pyparsing_ext')
+    from language import DL
+    return DL()
+
+
+@pytest.fixture
+def calc():
+    from calculators import OwlreadyCalculator, Thing
+    calc = OwlreadyCalculator()
+    calc.set_constant('Thing', Thing)
+    return calc
@@ -0,0 +1,66 @@
+import types
+
+import pytest
+from owlready2 import *
+
+from abox import ABoxIndex
+
+
+def test_matrix(onto):
+    np = pytest.importorskip('numpy')
+    with onto:
+        class A(Thing): pass
+        r = types.new_class('r', (ObjectProperty,))
+        a, b, *others = [A(f'a{k}') for k in range(8)]
+        a.r = [b]
+        # the ninth individual, not in the index until the OneOf is evaluated
+        c = Thing('c')
+    abox = ABoxIndex([a, b, *others])
+    concepts = [A, r.some(A), OneOf([b, c]), Not(A)]
+    M = abox.matrix([a, b], concepts)
+    assert M.tolist() == [[True, True, False, False], [True, False, True, False]]
+    assert M.tolist() == [[abox.contains(i, x) for x in concepts] for i in (a, b)]
+
+
+def random_abox(onto, seed=0):
+    import random
+    rng = random.Random(seed)
+    with onto:
+        classes = [Thing]
+        for k in range(12):
+            classes.append(types.new_class(f'C{k}', (rng.choice(classes),)))
+        classes = classes[1:]
+        r = types.new_class('r', (ObjectProperty,))
+        individuals = [rng.choice(classes)(f'i{k}') for k in range(60)]
+        for i in individuals:
+            i.r = rng.sample(individuals, rng.randint(0, 3))
+    return rng, classes, r, individuals
+
+
+def check(abox, individuals, concepts):
+    from utils import is_instance_of, clear_caches
+    clear_caches()
+    for c in concepts:
+        assert abox.members(c) == [i for i in individuals if is_instance_of(i, c)], c
+
+
+def test_extensions(onto):
+    rng, classes, r, individuals = random_abox(onto)
+    abox = ABoxIndex(individuals)
+    A, B, C = classes[:3]
+    check(abox, individuals, [Thing, *classes, And([A, B]), Or([A, Not(B)]), Not(And([A, Or([B, C])])),
+        OneOf(individuals[::7]), And([A, OneOf(individuals[::3])])])
+    assert abox.count(Or([A, Not(A)])) == len(individuals)
+
+
+def test_restrictions(onto):
+    rng, classes, r, individuals = random_abox(onto)
+    abox = ABoxIndex(individuals)
+    A, B = classes[:2]
+    concepts = [r.some(A), r.only(A), r.value(individuals[0]), r.some(r.some(Not(B))),
+        r.min(2, A), r.max(1, A), r.exactly(1, Or([A, B])), r.max(0, Thing)]
+    check(abox, individuals, concepts)
+    with onto:
+        for i in individuals[:10]:
+            abox.relate(i, r, rng.choice(individuals))
+    check(abox, individuals, concepts)
@@ -0,0 +1,28 @@
+import pytest
+from owlready2 import *
+
+pytest.importorskip('pyparsing_ext')
+
+from actions import compile_action
+
+
+def test_compile(onto, dl, calc):
+    from benchmarks import generator
+    ontology = generator.Ontology(depth=2, width=4, individuals=30)
+    with onto:
+        for name in ontology.roles:
+            calc.set_constant(name, type(name, (ObjectProperty,), {}))
+        dl.parse(ontology.declarations()).eval(calc)
+    for query in ontology.iter_queries(100, nesting=3):
+        tree = dl.parse(query)
+        assert compile_action(tree, calc)(calc) == tree.eval(calc), query
+
+
+def test_free_names(onto, dl, calc):
+    with onto:
+        dl.parse('! A :: Thing; ! B :: Thing; ! a : A; ! b : B').eval(calc)
+    f = dl.compile('a : A', calc, free=('a',))
+    assert f(calc)
+    assert not f(calc | {'a': calc['b']})
+    # the other names are resolved once
+    assert dl.compile('a : A', calc)(calc | {'a': calc['b']})
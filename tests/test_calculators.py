@@ -0,0 +1,49 @@
+import gc
+import types
+
+import pytest
+
+from owlready2 import *
+
+from calculators import OwlreadyCalculator
+
+
+def test_hash_consing(onto):
+    calc = OwlreadyCalculator()
+    with onto:
+        class A(Thing): pass
+        class B(Thing): pass
+        r = types.new_class('r', (ObjectProperty,))
+    c = calc.conjunction([A, calc.negation(B), A])
+    assert c is calc.conjunction([calc.negation(B), A])
+    assert c is calc.intern(And([Not(B), A]))
+    assert calc.intern(r.some(Or([B, A]))) is calc.intern(r.some(Or([A, B])))
+    assert calc.intern(OneOf([A('a'), A('b')])) is calc.intern(OneOf([onto.b, onto.a, onto.b]))
+
+
+def test_unused_concepts(onto):
+    calc = OwlreadyCalculator()
+    with onto:
+        class A(Thing): pass
+    for k in range(100):
+        calc.negation(calc.conjunction([A, OneOf([A(f'a{k}')])]))
+    gc.collect()
+    assert len(calc.concepts) == len(calc._keys) == 0
+    c = calc.negation(A)
+    assert len(calc.concepts) == len(calc._keys) == 1 and calc.key(c) == (Not, A)
+
+
+def test_scopes():
+    from calculators import BaseCalculator, anaphora
+    calc = BaseCalculator()
+    calc.set_constant('Thing', 0)
+    calc['x'] = 1
+    inner = calc | {'y': 2}
+    innermost = inner | {'x': 3}
+    assert (inner['x'], inner['y'], inner[anaphora]) == (1, 2, 2)
+    assert (innermost['x'], innermost['y'], innermost[anaphora]) == (3, 2, 3)
+    # the outer scopes are left as they were
+    assert 'y' not in calc and calc['x'] == 1 and calc[anaphora] == 1
+    assert len(innermost.memory.maps) == 3 and innermost.memory.maps[-1] is calc.memory
+    with pytest.raises(NameError):
+        calc | {'Thing': 1}
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip('pyparsing_ext')
+
+import dlcache
+import nodes
+from actions import StatementSequenceAction
+from language import DL
+
+
+@pytest.mark.parametrize('lean', [False, True])
+def test_parseFile(tmp_path, lean):
+    filename = tmp_path / 'script.dl'
+    filename.write_text('! A :: Thing;\n! a : A;\na : A & some r. B;\nA <= B')
+    dl = DL(lean=lean)
+    parsed = dl.parseFile(str(filename), precompiled=True)
+    assert (tmp_path / 'script.dlc').exists()
+    cached = dl.parseFile(str(filename), precompiled=True)
+    assert isinstance(cached.tokens, dlcache.LazyStatements)
+    assert type(cached) is (nodes.SequenceNode if lean else dlcache.CachedStatementSequence)
+    assert isinstance(cached, type(parsed))
+    assert list(map(str, cached.tokens)) == list(map(str, parsed.tokens))
+    # the file is closed once every statement is unpickled
+    assert cached.tokens.buffer.closed
+
+
+def test_stale(tmp_path):
+    filename = tmp_path / 'script.dl'
+    filename.write_text('a : A')
+    dl = DL()
+    dl.parseFile(str(filename), precompiled=True)
+    key = dlcache.fingerprint(DL)
+    assert dlcache.load(str(tmp_path / 'script.dlc'), 'a : B', key) is None
+    assert dlcache.load(str(tmp_path / 'script.dlc'), 'a : A', bytes(32)) is None
+    assert dlcache.load(str(tmp_path / 'script.dlc'), 'a : A', key) is not None
+
+
+def test_opt_in(tmp_path):
+    filename = tmp_path / 'script.dl'
+    filename.write_text('a : A')
+    DL().parseFile(str(filename))
+    assert not (tmp_path / 'script.dlc').exists()
+    # an existing cache is not loaded either
+    (tmp_path / 'script.dlc').write_bytes(b'not a pickle')
+    assert list(map(str, DL().parseFile(str(filename)).tokens)) == ['a : A']
@@ -0,0 +1,27 @@
+from benchmarks import generator
+
+
+def test_ontology():
+    ontology = generator.Ontology(depth=3, width=4, individuals=10, seed=1)
+    assert generator.generate(3, 4, 10, queries=5, seed=1) == generator.generate(3, 4, 10, queries=5, seed=1)
+    declared = {'Thing'}
+    for declaration in ontology.iter_declarations():
+        # ! name :: parent, or ! name : parent
+        _, name, _, parent = declaration.split()
+        # the parents are declared first
+        assert parent in declared
+        declared.add(name)
+    assert len(declared) == 1 + 3 * 4 + 10
+    assert len(list(ontology.iter_queries(8))) == 8
+
+
+def test_no_roles():
+    ontology = generator.Ontology(roles=())
+    assert not any('some' in q or 'only' in q for q in ontology.iter_queries(100, nesting=3))
+
+
+def test_declarations_parse(onto, dl, calc):
+    ontology = generator.Ontology(depth=2, width=3, individuals=10)
+    with onto:
+        dl.parse(ontology.declarations()).eval(calc)
+    assert all(set(calc[name].is_a) == {calc[klass]} for name, klass in ontology.types.items())
@@ -0,0 +1,76 @@
+import random
+import types
+
+from owlready2 import *
+
+from hierarchy import HierarchyIndex
+from incremental import Maintainer
+from utils import is_a
+
+
+def random_classes(onto, n, seed=0):
+    rng = random.Random(seed)
+    classes = [Thing]
+    with onto:
+        for k in range(n):
+            bases = tuple(set(rng.sample(classes, min(len(classes), rng.randint(1, 2)))))
+            if Thing in bases and len(bases) > 1:
+                bases = tuple(b for b in bases if b is not Thing)
+            classes.append(types.new_class(f'C{k}', bases))
+    return classes
+
+
+def test_ancestors(onto):
+    classes = random_classes(onto, 60)
+    index = HierarchyIndex(classes)
+    for A in classes:
+        for B in classes:
+            assert index.is_subclass(A, B) == (B in A.INDIRECT_is_a or A is B), (A, B)
+
+
+def test_equivalent_classes(onto):
+    with onto:
+        class A(Thing): pass
+        class B(Thing):
+            equivalent_to = [A]
+        class C(B): pass
+        class D(Thing): pass
+        class E(D): pass
+    classes = [A, B, C, D, E]
+    assert is_a(B, A) and is_a(C, A) and is_a(A, B)
+    with onto:
+        D.equivalent_to.append(C)
+    Maintainer().declared(D)
+    for X in classes:
+        for Y in classes:
+            assert is_a(X, Y) == (Y in X.INDIRECT_is_a), (X, Y)
+
+
+def test_inf_sup(onto):
+    from utils import inf, sup
+    rng = random.Random(1)
+    classes = random_classes(onto, 40, seed=1)[1:]
+    with onto:
+        r = types.new_class('r', (ObjectProperty,))
+    others = [r.some(classes[0]), And([classes[1], classes[2]])]
+    for _ in range(20):
+        As = rng.sample(classes, 8) + others
+        assert inf(As) == [A for A in As if not any(B is not A and is_a(B, A) for B in As)]
+        assert sup(As) == [A for A in As if not any(B is not A and is_a(A, B) for B in As)]
+
+
+def test_stale_index(onto):
+    from utils import clear_caches, hierarchy_index, inf, sup
+    with onto:
+        class A(Thing): pass
+        class B(Thing): pass
+        class C(A): pass
+    assert not is_a(A, B) and not is_a(C, B)
+    with onto:
+        A.is_a.append(B)
+    clear_caches()
+    assert is_a(A, B) and is_a(C, B)
+    assert inf([B, C]) == [C] and sup([B, C]) == [B]
+    assert not hierarchy_index.is_current(C)
+    Maintainer().declared(A)
+    assert hierarchy_index.is_current(C) and hierarchy_index.is_subclass(C, B)
@@ -0,0 +1,71 @@
+import random
+import types
+
+from owlready2 import *
+
+from calculators import OwlreadyCalculator
+from utils import is_a, is_instance_of, clear_caches
+
+
+def answers(individuals, classes, concepts):
+    return [is_instance_of(i, c) for i in individuals for c in concepts] + \
+        [is_a(A, c) for A in classes for c in concepts]
+
+
+def test_declared(onto):
+    rng = random.Random(0)
+    calc = OwlreadyCalculator()
+    with onto:
+        r = types.new_class('r', (ObjectProperty,))
+        classes = [Thing]
+        for k in range(20):
+            classes.append(types.new_class(f'C{k}', (rng.choice(classes),)))
+        classes = classes[1:]
+        individuals = [rng.choice(classes)(f'i{k}') for k in range(30)]
+        for i in individuals:
+            i.r = rng.sample(individuals, 2)
+    concepts = classes + [And([rng.choice(classes), Not(rng.choice(classes))]) for _ in range(5)] \
+        + [r.some(rng.choice(classes)) for _ in range(5)]
+    abox = calc.materialize(onto)
+    for step in range(30):
+        answers(individuals, classes, concepts)
+        with onto:
+            if step % 3 == 0:
+                x = rng.choice(classes)
+                # not a subclass of x, that would make a cycle
+                x.is_a.append(rng.choice([c for c in classes if c not in x.descendants()] or [Thing]))
+            elif step % 3 == 1:
+                x = rng.choice(classes)(f'n{step}')
+                individuals.append(x)
+            else:
+                x = None
+                abox.relate(rng.choice(individuals), r, rng.choice(individuals))
+        if x is not None:
+            calc.declared(x)
+        incremental = answers(individuals, classes, concepts)
+        members = [abox.contains(i, c) for i in individuals for c in concepts]
+        clear_caches()
+        assert all(is_a(A, B) == (B in A.INDIRECT_is_a) for A in classes for B in classes)
+        assert incremental == answers(individuals, classes, concepts)
+        assert members == [is_instance_of(i, c) for i in individuals for c in concepts]
+    assert calc.maintainer.stats['classes'] == 10 and calc.maintainer.stats['individuals'] == 10
+
+
+def test_direct_relations(onto):
+    calc = OwlreadyCalculator()
+    with onto:
+        r = types.new_class('r', (ObjectProperty,))
+        class A(Thing): pass
+        a, b, c = Thing('a'), A('b'), Thing('c')
+    concepts = [r.some(A), r.only(A), r.max(0, Thing)]
+    abox = calc.materialize(onto)
+    assert [abox.contains(a, x) for x in concepts] == [False, False, True]
+    with onto:
+        a.r.append(b)
+    calc.declared(a)
+    assert [abox.contains(a, x) for x in concepts] == [True, True, False]
+    with onto:
+        c.r = [a]
+    calc.maintainer.related(r)
+    assert [abox.contains(c, x) for x in concepts] == [False, False, False]
+    assert [abox.contains(a, x) for x in concepts] == [is_instance_of(a, x) for x in concepts]
@@ -0,0 +1,48 @@
+import io
+
+import pyparsing as pp
+import pytest
+
+from owlready2 import *
+
+
+@pytest.mark.parametrize('backend', ['pyparsing', 'pratt'])
+def test_iterParse(onto, calc, backend):
+    pytest.importorskip('pyparsing_ext')
+    from language import DL
+    dl = DL(backend=backend)
+    statements = list(dl.iterParse(io.StringIO('! A :: Thing;\n! a : A;\na : A;\n')))
+    assert len(statements) == 3
+    with onto:
+        for statement in statements:
+            value = statement.eval(calc)
+    assert value
+    with pytest.raises(pp.ParseException):
+        # not truncated to `a : A`
+        list(dl.iterParse(io.StringIO('a : A B; a : A')))
+
+
+@pytest.mark.parametrize('lean', [False, True])
+def test_parse_cache(lean):
+    pytest.importorskip('pyparsing_ext')
+    from language import DL
+    dl = DL(cache_size=8, lean=lean)
+    tree = dl.parse('a : A; A <= B')
+    assert dl.parse('a : A; A <= B') is tree
+    spaced = dl.parse('a  :  A;   A <= B')
+    assert spaced is not tree
+    assert [statement.loc for statement in spaced.tokens] == [0, 11]
+    assert dl.matches('a : A') and dl.matches('a  :  A')
+    assert dl.cache_info()['size'] == 3
+
+
+@pytest.mark.parametrize('lean', [False, True])
+def test_parallelParse(lean):
+    pytest.importorskip('pyparsing_ext')
+    from benchmarks import generator
+    from language import DL
+    ontology = generator.Ontology(depth=2, width=4, individuals=20)
+    source = ontology.declarations() + ';\n' + ontology.queries(20)
+    dl = DL(lean=lean)
+    parallel = dl.parallelParse(source, processes=2, chunk_statements=7)
+    assert list(map(str, parallel.tokens)) == list(map(str, dl.parse(source).tokens))
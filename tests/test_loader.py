@@ -0,0 +1,29 @@
+import pytest
+from owlready2 import *
+
+
+def test_bulk_loader(onto, dl, calc):
+    from loader import BulkLoader
+    loader = BulkLoader(calc, onto, batch_size=3)
+    statements = dl.parse('! A :: Thing; ! B :: A; ! a : A; ! b : B; ! c : A, B; a : A').tokens
+    values = [loader.add(statement) for statement in statements]
+    assert values == [None] * 5 + [True]
+    assert not onto.world.graph.db.in_transaction
+    assert calc['c'].is_a == [calc['A'], calc['B']]
+    assert loader.stats()['statements'] == 6
+
+
+def test_rebound_names(onto, dl, calc):
+    from loader import BulkLoader
+    loader = BulkLoader(calc, onto)
+    for statement in dl.parse('! A :: Thing; ! a : A').tokens:
+        loader.add(statement)
+    loader.flush()
+    with onto:
+        class Other(Thing): pass
+    calc['A'] = Other
+    for statement in dl.parse('! b : A; ! A :: Thing; ! c : A').tokens:
+        loader.add(statement)
+    loader.flush()
+    assert calc['b'].is_a == [Other]
+    assert calc['c'].is_a == [calc['A']] and calc['A'] is not Other
@@ -0,0 +1,34 @@
+import pickle
+
+import pytest
+from owlready2 import *
+
+
+SCRIPT = '! A :: Thing; ! B :: A; ! b : B; ! c : A, some r. B; b : A & ~(some r. A); c : some r. B | B; B <= A <= Thing'
+
+
+def test_lower(onto, dl, calc):
+    import nodes
+    with onto:
+        calc.set_constant('r', type('r', (ObjectProperty,), {}))
+        tree = dl.parse(SCRIPT)
+        lean = nodes.lower(tree)
+        assert type(lean) is nodes.SequenceNode
+        assert [type(node).__name__ for node in lean.tokens] == \
+            ['ConceptDeclaration', 'ConceptDeclaration', 'Declaration', 'Declaration', 'Containing', 'Containing', 'Comparison']
+        assert lean.eval(calc) is True
+        assert [node.eval(calc) for node in lean.tokens[4:]] == [token.eval(calc) for token in tree.tokens[4:]]
+    # the nodes print as sources of the same trees
+    assert nodes.lower(dl.parse(str(lean))) == lean
+    assert not hasattr(lean.tokens[4], 'instring') and not hasattr(lean.tokens[4], '__dict__')
+    with pytest.raises(AttributeError):
+        lean.tokens[4].concept = None
+    assert pickle.loads(pickle.dumps(lean)) == lean
+
+
+def test_star_import(dl):
+    import collections.abc
+    namespace = {}
+    exec('from owlready2 import *\nfrom collections.abc import *\nfrom nodes import *', namespace)
+    assert namespace['Restriction'] is Restriction
+    assert namespace['Sequence'] is collections.abc.Sequence
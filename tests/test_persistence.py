@@ -0,0 +1,37 @@
+import types
+
+from owlready2 import *
+
+import persistence
+from calculators import OwlreadyCalculator
+
+
+def queries(calc):
+    A, B, r, a, b = (calc[name] for name in ('A', 'B', 'r', 'a', 'b'))
+    concepts = [A, B, calc('&')([A, calc('~')(B)]), r.some(B), OneOf([b])]
+    return [calc(':')(i, c) for i in (a, b) for c in concepts] + [calc('<=')(B, A), calc('<=')(A, B)]
+
+
+def test_save_restore(onto, tmp_path):
+    world = World()
+    ontology = world.get_ontology('http://already.org/tests/persistence.owl')
+    calc = OwlreadyCalculator()
+    calc.set_constant('Thing', Thing)
+    with ontology:
+        calc['r'] = types.new_class('r', (ObjectProperty,))
+        calc['A'] = types.new_class('A', (Thing,))
+        calc['B'] = types.new_class('B', (calc['A'],))
+        calc['a'] = calc['A']('a')
+        calc['b'] = calc['B']('b')
+        calc['a'].r = [calc['b']]
+    calc.declared(calc['A'], calc['B'], calc['a'], calc['b'])
+    calc.materialize(ontology)
+    expected = queries(calc)
+    filename = str(tmp_path / 'kb.sqlite3')
+    persistence.save(calc, filename, world)
+    world.close()
+    restored = persistence.restore(filename, World())
+    assert type(restored) is OwlreadyCalculator and restored.abox is not None
+    assert restored['B'] is not calc['B'] and restored['B'].iri == calc['B'].iri
+    assert queries(restored) == expected
+    assert restored(':').__self__ is restored.abox
@@ -0,0 +1,34 @@
+import itertools
+import types
+
+from owlready2 import *
+
+import planner
+
+
+def test_plan_chain():
+    assert [k for k, _ in planner.plan_chain([1, 1, 100], ['<=', '<='])] == [0, 1]
+    assert [k for k, _ in planner.plan_chain([100, 1, 1], ['<=', '<='])] == [1, 0]
+    # an equality is more selective than a subsumption
+    assert planner.plan_chain([1, 1, 1], ['<=', '=='])[0][0] == 1
+    plan = planner.plan_chain([3, 1, 4, 1, 5], ['<=', '<', '==', '>='])
+    assert sorted(k for k, _ in plan) == [0, 1, 2, 3]
+
+
+def test_order(onto):
+    with onto:
+        class A(Thing): pass
+        r = types.new_class('r', (ObjectProperty,))
+    some, nominal = r.some(A), OneOf([A('a')])
+    assert planner.order([some, A, nominal]) == [nominal, A, some]
+    assert planner.order([some, A], conjunctive=False) == [A, some]
+
+
+def test_comparison_chains(onto, dl, calc):
+    with onto:
+        dl.parse('! A :: Thing; ! B :: A; ! C :: B').eval(calc)
+    names = ['A', 'B', 'C']
+    for X, Y, Z in itertools.product(names, repeat=3):
+        for op1, op2 in itertools.product(['<=', '>=', '<', '=='], repeat=2):
+            expected = calc(op1)(calc[X], calc[Y]) and calc(op2)(calc[Y], calc[Z])
+            assert dl.parse(f'{X} {op1} {Y} {op2} {Z}').eval(calc) == expected
@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip('pyparsing_ext')
+
+import pratt
+from parser import make_grammar
+
+# edge cases of the grammar, and malformed sources, that both parsers reject
+CORPUS = [
+    'A <= B', 'A <= B <= C', 'A < B >= C == D', 'a : A', 'a : {a, b}', 'a : {a}',
+    'a : A & B | C', 'a : A | B & C', 'a : A ^ B ^ C', 'a : (A | B) & C', 'a : ((A))',
+    'a : ~A', 'a : ~~A', 'a : ~A & B', 'a : ~(A & B)', 'a : ~some r. A',
+    'a : some r. A', 'a : only r. (A | B)', 'a : some r. some s. A', 'a : some r. A & B',
+    'a : more 2 r. A', 'a : less 0 r. ~A', 'a : equal 3 r. {b, c}', 'a : some r. ~A | only s. B',
+    '! A :: B', '! A :: B, C & D', '! a : A', '! a : A, some r. B', '! A := B & C', '! A & B :: C',
+    '! A :: B; a : A; A <= B', 'a:A;b:B', '  a  :\n A  ',
+    'a : A &', 'a : & A', 'a : some r A', 'a : more r. A', 'a : {}', 'a : (A', 'A <=', '! A ::',
+    'a : A B', '', ';', 'a : some. A',
+]
+
+
+@pytest.mark.parametrize('source', CORPUS)
+def test_differences(source):
+    assert pratt.differences(source, make_grammar().statement_sequence) == []
+
+
+def test_generated():
+    from benchmarks import generator
+    ontology = generator.Ontology(depth=2, width=5, individuals=50)
+    grammar = make_grammar().statement_sequence
+    for statement in list(ontology.iter_declarations()) + list(ontology.iter_queries(200, nesting=3)):
+        assert pratt.differences(statement, grammar) == [], statement
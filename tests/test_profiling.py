@@ -0,0 +1,36 @@
+import pytest
+from owlready2 import *
+
+profiling = pytest.importorskip('profiling')
+
+
+@pytest.fixture
+def script(onto, dl, calc):
+    with onto:
+        class I(Thing): pass
+        class J(I): pass
+        i = J('i')
+    for x in (I, J, i):
+        calc.set_constant(x.name, x)
+    return 'i : I & J; J <= I'
+
+
+@pytest.mark.parametrize('lean', [False, True])
+def test_statements(script, calc, lean):
+    from language import DL
+    tree = DL(lean=lean).parse(script)
+    with profiling.Profiler(calc) as profiler:
+        assert tree.eval(calc)
+    assert sorted(profiler.statements) == ['0: i : I & J', '11: J <= I']
+    assert all(calls == 1 for calls, _ in profiler.statements.values())
+    names = {'SequenceNode', 'Containing', 'Comparison'} if lean else \
+        {'StatementSequenceAction', 'ContainingFormulaAction', 'ComparisonFormulaAction'}
+    assert names <= set(profiler.calls)
+
+
+def test_disable(script, calc, dl):
+    tree = dl.parse(script)
+    with profiling.Profiler(calc) as profiler:
+        pass
+    tree.eval(calc)
+    assert not profiler.calls
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from owlready2 import *
+
+
+def test_server(tmp_path, onto, dl, calc):
+    from server import Server, Client
+    with onto:
+        dl.parse('! A :: Thing; ! B :: A; ! b : B').eval(calc)
+    path = str(tmp_path / 'already.sock')
+
+    async def session():
+        server = Server(calc, onto, batch_size=4)
+        task = asyncio.create_task(server.serve(path=path))
+        try:
+            while not (tmp_path / 'already.sock').exists():
+                await asyncio.sleep(0.01)
+            client = await Client().connect(path=path)
+            questions = ['b : A', 'A <= B', '! c : A', 'c : B', 'b : ~A', 'c : C']
+            messages = await asyncio.gather(*map(client.ask, questions))
+            await client.close()
+            return messages
+        finally:
+            task.cancel()
+
+    messages = asyncio.run(session())
+    assert [message['id'] for message in messages] == list(range(6))
+    assert [message.get('respond') for message in messages[:2]] == [True, False]
+    # the declaration is made before the next question
+    assert messages[3]['respond'] is False and messages[4]['respond'] is False
+    assert 'error' in messages[5] and 'C' in messages[5]['error']
+
+
+def test_connection_closed(tmp_path):
+    pytest.importorskip('pyparsing_ext')
+    from server import Client
+    path = str(tmp_path / 'closing.sock')
+
+    async def hang_up(reader, writer):
+        # reads the question, closes without answering
+        await reader.readline()
+        writer.close()
+
+    async def session():
+        server = await asyncio.start_unix_server(hang_up, path=path)
+        async with server:
+            client = await Client().connect(path=path)
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(client.ask('a : A'), 5)
+            with pytest.raises(ConnectionError):
+                await client.ask('a : A')
+            await client.close()
+            # the questions pending when the client is closed fail too
+            client = await Client().connect(path=path)
+            pending = asyncio.get_running_loop().create_future()
+            client.futures[0] = pending
+            await client.close()
+            with pytest.raises(ConnectionError):
+                await pending
+
+    asyncio.run(session())
@@ -0,0 +1,52 @@
+from owlready2 import *
+
+import snapshot
+from calculators import OwlreadyCalculator
+from utils import is_a
+from test_abox import random_abox
+
+
+def test_snapshot(onto, tmp_path):
+    rng, classes, r, individuals = random_abox(onto)
+    calc = OwlreadyCalculator()
+    abox = calc.materialize(onto)
+    A, B = classes[:2]
+    concepts = [(A.name, A), (('and', A.name, ('not', B.name)), And([A, Not(B)])),
+        (('or', A.name, B.name), Or([A, B])), (('some', 'r', A.name), r.some(A)),
+        (('only', 'r', B.name), r.only(B)), (('min', 2, 'r', 'Thing'), r.min(2, Thing)),
+        (('value', 'r', individuals[0].name), r.value(individuals[0])),
+        (('one_of', individuals[1].name, individuals[2].name), OneOf(individuals[1:3]))]
+    filename = calc.export_snapshot(str(tmp_path / 'kb.snapshot'), ontology=onto)
+    shm = calc.export_snapshot(ontology=onto)
+    try:
+        for snap in (snapshot.Snapshot.open(filename), snapshot.Snapshot.attach(shm.name)):
+            with snap:
+                for X in classes:
+                    for Y in classes:
+                        assert snap.is_a(X.name, Y.name) == is_a(X, Y)
+                for c, concept in concepts:
+                    assert snap.members(c) == [i.name for i in abox.members(concept)], c
+                    assert [snap.is_instance_of(i.name, c) for i in individuals] == \
+                        [abox.contains(i, concept) for i in individuals]
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_other_world(tmp_path):
+    import types
+    world = World()
+    onto = world.get_ontology('http://already.org/tests/world.owl')
+    with onto:
+        class A(Thing): pass
+        r = types.new_class('r', (ObjectProperty,))
+        a, b = Thing('a'), A('b')
+        a.r = [b]
+    calc = OwlreadyCalculator()
+    calc.materialize(onto)
+    try:
+        filename = calc.export_snapshot(str(tmp_path / 'kb.snapshot'))
+        with snapshot.Snapshot.open(filename) as snap:
+            assert snap.members(('some', 'r', 'A')) == ['a']
+    finally:
+        world.close()
@@ -0,0 +1,53 @@
+from owlready2 import *
+
+from utils import is_a, is_instance_of, nominal_index, membership_cache, subsumption_cache
+
+
+def test_nominals(onto):
+    with onto:
+        class A(Thing): pass
+        a, b, c = A('a'), A('b'), A('c')
+        nominal = OneOf([a, b])
+        part = OneOf([a])
+    assert is_instance_of(a, nominal) and not is_instance_of(c, nominal)
+    assert is_a(part, nominal) and not is_a(nominal, part)
+    # the nominals are neither hashed nor cached
+    assert not any(isinstance(x, OneOf) for key in membership_cache.data for x in key)
+    assert not any(isinstance(x, OneOf) for key in subsumption_cache.data for x in key)
+    # the same number of members
+    nominal.instances[1] = c
+    assert is_instance_of(c, nominal) and not is_instance_of(b, nominal)
+    part.instances.append(b)
+    assert not is_a(part, nominal)
+    assert nominal_index.members(nominal) == {a, c}
+
+
+def test_memoized(onto):
+    from utils import cache_info, clear_caches
+    with onto:
+        class A(Thing): pass
+        class B(Thing): pass
+        a = A('a')
+    c = And([A, Not(B)])
+    assert is_instance_of(a, c) and not is_a(A, B)
+    hits = cache_info()['is_instance_of']['hits'], cache_info()['is_a']['hits']
+    assert is_instance_of(a, c) and not is_a(A, B)
+    assert cache_info()['is_instance_of']['hits'] == hits[0] + 1
+    assert cache_info()['is_a']['hits'] == hits[1] + 1
+    with onto:
+        a.is_a.append(B)
+    clear_caches()
+    assert not is_instance_of(a, c)
+
+
+def test_declared_invalidates(onto, calc):
+    with onto:
+        class A(Thing): pass
+        class B(Thing): pass
+        a = A('a')
+    c = And([A, Not(B)])
+    assert is_instance_of(a, c)
+    with onto:
+        a.is_a.append(B)
+    calc.declared(a)
+    assert not is_instance_of(a, c)